@@ -0,0 +1,79 @@
+import hashlib
+import os
+import pygame
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+BACKGROUND_IMAGE = "Background Image.png"
+ASSET_CACHE_DIR = ".asset_cache"
+
+
+def source_digest(path):
+    """
+    SHA-256 of the file at `path`, so an edited source image never hits a stale cache entry.
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _display_ready(surface):
+    # convert() needs a display mode; without one the surface is used as loaded
+    if pygame.display.get_surface() is not None:
+        return surface.convert()
+    return surface
+
+
+def load_scaled_image(path, size, cache_dir=ASSET_CACHE_DIR):
+    """
+    Load `path` scaled to `size`, through an on-disk cache of the decoded,
+    scaled pixels. A cache hit skips PNG decoding and rescaling entirely.
+
+    Args:
+        path: Source image file
+        size: (width, height) to scale to
+        cache_dir: Directory holding cached pixel data
+
+    Returns:
+        tuple: (surface converted to the display format when one is set, True on a cache hit)
+    """
+    width, height = size
+    cache_path = os.path.join(cache_dir, f"{source_digest(path)[:16]}-{width}x{height}.rgb")
+    try:
+        with open(cache_path, "rb") as f:
+            pixels = f.read()
+    except FileNotFoundError:
+        pixels = None
+    if pixels is not None and len(pixels) == width * height * 3:
+        return _display_ready(pygame.image.frombytes(pixels, size, "RGB")), True
+
+    surface = pygame.transform.scale(pygame.image.load(path), size)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = cache_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(pygame.image.tobytes(surface, "RGB"))
+    os.replace(temp_path, cache_path)
+    return _display_ready(surface), False
+
+
+class Assets:
+    def __init__(self, cache_dir=ASSET_CACHE_DIR, size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+        """
+        Game images, each loaded on first use and kept for the rest of the run.
+
+        Args:
+            cache_dir: Directory for cached scaled images
+            size: Screen size the background is scaled to
+        """
+        self.cache_dir = cache_dir
+        self.size = size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._background = None
+
+    def background(self):
+        if self._background is None:
+            self._background, hit = load_scaled_image(BACKGROUND_IMAGE, self.size, self.cache_dir)
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        return self._background
@@ -1,41 +1,166 @@
 import pygame
-from circleshape import CircleShape
-from constants import LINE_WIDTH, ASTEROID_MIN_RADIUS
+from entitystore import StoredShape
+from constants import (
+    LINE_WIDTH,
+    ASTEROID_MIN_RADIUS,
+    ASTEROID_SHAPE_POOL,
+    ASTEROID_SHAPE_VARIANTS,
+    USE_SPRITE_POOLS,
+)
 from logger import log_event
+from render import prepare_image
+from pool import SpritePool
 import random
-class Asteroid(CircleShape):
+
+
+# Outline tables: the unit vertex directions for every vertex count an
+# outline can have, and a ring of jitter factors that outlines take a run of
+# consecutive entries from. Built from their own RNG, once.
+_VERTEX_COUNTS = range(8, 15)
+_UNIT_OUTLINES = {
+    count: [pygame.Vector2(0, 1).rotate(i / count * 360) for i in range(count)] for count in _VERTEX_COUNTS
+}
+_JITTER_SIZE = 1024
+_table_rng = random.Random(0)
+_JITTER = [_table_rng.uniform(0.7, 1.15) for _ in range(_JITTER_SIZE)]
+# Repeat the head so any run can be sliced without wrapping around
+_JITTER += _JITTER[:max(_VERTEX_COUNTS)]
+
+
+def build_shape(radius, rng=random):
+    """
+    Random lumpy outline around the origin, from the precomputed tables: two
+    random draws per outline instead of one per vertex.
+
+    Returns:
+        list: pygame.Vector2 vertices
+    """
+    units = _UNIT_OUTLINES[rng.randint(8, 14)]
+    start = rng.randrange(_JITTER_SIZE)
+    return [unit * (radius * jitter) for unit, jitter in zip(units, _JITTER[start:start + len(units)])]
+
+
+class ShapeVariant:
+    def __init__(self, radius, points):
+        self.points = points
+        self.size = int(radius * 2.3) + LINE_WIDTH * 2 + 2
+        self.half = self.size / 2
+        self._image = None
+
+    def image(self):
+        # Rasterized on first draw, so headless runs never build surfaces
+        if self._image is None:
+            surface = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
+            center = pygame.Vector2(self.half, self.half)
+            pygame.draw.polygon(surface, "white", [center + p for p in self.points], LINE_WIDTH)
+            self._image = prepare_image(surface)
+        return self._image
+
+
+class ShapePool:
+    def __init__(self, variants=ASTEROID_SHAPE_VARIANTS):
+        # A fixed set of outlines per radius, shared by every asteroid of that size
+        self.variants = variants
+        self._shapes = {}
+        # Outlines are cosmetic: they come from their own RNG, never the game's,
+        # so switching the pool on or off can't change a seeded run
+        self.rng = random.Random(0)
+
+    def choose(self, radius):
+        shapes = self._shapes.get(radius)
+        if shapes is None:
+            # Own RNG per radius, so a radius always gets the same variants
+            rng = random.Random(radius)
+            shapes = self._shapes[radius] = [
+                ShapeVariant(radius, build_shape(radius, rng)) for _ in range(self.variants)
+            ]
+        return shapes[self.rng.randrange(len(shapes))]
+
+
+shape_pool = ShapePool()
+
+
+class Asteroid(StoredShape):
+    __slots__ = ("_variant", "_shape")
+
+    # True: blit a pooled pre-rendered outline; False: rebuild the polygon every frame
+    use_shape_pool = ASTEROID_SHAPE_POOL
+
     def __init__(self, x, y, radius):
         super().__init__(x, y, radius)
-        self._shape = self._build_shape()
-
-    def _build_shape(self):
-        points = []
-        vertex_count = random.randint(8, 14)
-        for i in range(vertex_count):
-            angle = (i / vertex_count) * 360
-            jitter = random.uniform(0.7, 1.15)
-            distance = self.radius * jitter
-            points.append(pygame.Vector2(0, 1).rotate(angle) * distance)
-        return points
+        self._choose_shape(radius)
+
+    def reset(self, x, y, radius):
+        super().reset(x, y, radius)
+        self._choose_shape(radius)
+
+    def _choose_shape(self, radius):
+        if self.use_shape_pool:
+            self._variant = shape_pool.choose(radius)
+            self._shape = self._variant.points
+        else:
+            self._variant = None
+            self._shape = build_shape(radius, shape_pool.rng)
+
+    def blit_image(self):
+        variant = self._variant
+        if variant is None:
+            return None
+        return variant.image(), variant.half
 
     def draw(self, screen):
-        points = [self.position + p for p in self._shape]
+        source = self.blit_source()
+        if source is not None:
+            screen.blit(*source)
+            return
+        position = self.render_position()
+        points = [position + p for p in self._shape]
         pygame.draw.polygon(screen, "white", points, LINE_WIDTH)
 
-    def update(self, dt):
-        self.position += self.velocity * dt
+    @classmethod
+    def spawn_batch(cls, spawns):
+        """
+        Spawn many asteroids in one call, reusing pooled ones where possible.
 
-    def asteroid_split(self):
-        self.kill()
-        if self.radius <= ASTEROID_MIN_RADIUS:
-            return
-        else:
-            log_event("asteroid_split")
-            random_vector = random.uniform(20,50)
-            new_asteroid_1_vector = self.velocity.rotate(random_vector)
-            new_asteroid_2_vector = self.velocity.rotate(-random_vector)
-            new_asteroid_radius = self.radius - ASTEROID_MIN_RADIUS
-            new_asteroid_1 = Asteroid(self.position.x, self.position.y, new_asteroid_radius)
-            new_asteroid_1.velocity = new_asteroid_1_vector
-            new_asteroid_2 = Asteroid(self.position.x, self.position.y, new_asteroid_radius)
-            new_asteroid_2.velocity = new_asteroid_2_vector
+        Args:
+            spawns: Sequence of (x, y, radius, velocity)
+
+        Returns:
+            list: The new asteroids, in the order of `spawns`
+        """
+        spawn = cls.spawn
+        asteroids = []
+        for x, y, radius, velocity in spawns:
+            asteroid = spawn(x, y, radius)
+            asteroid.velocity = velocity
+            asteroids.append(asteroid)
+        return asteroids
+
+
+def split_asteroids(asteroids):
+    """
+    Break up every asteroid shot this frame in one pass. Each one bigger than
+    the smallest kind leaves two smaller ones, flying off at a random angle
+    either side of its heading, and all of them are spawned as one batch.
+
+    Args:
+        asteroids: Asteroids that were hit, already killed
+    """
+    spawns = []
+    for asteroid in asteroids:
+        radius = asteroid.radius
+        if radius <= ASTEROID_MIN_RADIUS:
+            continue
+        log_event("asteroid_split")
+        angle = random.uniform(20, 50)
+        position = asteroid.position
+        velocity = asteroid.velocity
+        child_radius = radius - ASTEROID_MIN_RADIUS
+        spawns.append((position.x, position.y, child_radius, velocity.rotate(angle)))
+        spawns.append((position.x, position.y, child_radius, velocity.rotate(-angle)))
+    if spawns:
+        Asteroid.spawn_batch(spawns)
+
+
+if USE_SPRITE_POOLS:
+    Asteroid.pool = SpritePool(Asteroid)
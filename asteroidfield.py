@@ -5,47 +5,71 @@ from constants import *
 
 
 class AsteroidField(pygame.sprite.Sprite):
+    # Group of live asteroids, counted against WRAP_MAX_ASTEROIDS; set by init_game()
+    asteroids = ()
+
+    # Per screen edge: direction asteroids head in, and the line they enter
+    # along as an origin plus a span scaled by a random 0-1 factor
     edges = [
-        [
+        (
             pygame.Vector2(1, 0),
-            lambda y: pygame.Vector2(-ASTEROID_MAX_RADIUS, y * SCREEN_HEIGHT),
-        ],
-        [
+            pygame.Vector2(-ASTEROID_MAX_RADIUS, 0),
+            pygame.Vector2(0, SCREEN_HEIGHT),
+        ),
+        (
             pygame.Vector2(-1, 0),
-            lambda y: pygame.Vector2(
-                SCREEN_WIDTH + ASTEROID_MAX_RADIUS, y * SCREEN_HEIGHT
-            ),
-        ],
-        [
+            pygame.Vector2(SCREEN_WIDTH + ASTEROID_MAX_RADIUS, 0),
+            pygame.Vector2(0, SCREEN_HEIGHT),
+        ),
+        (
             pygame.Vector2(0, 1),
-            lambda x: pygame.Vector2(x * SCREEN_WIDTH, -ASTEROID_MAX_RADIUS),
-        ],
-        [
+            pygame.Vector2(0, -ASTEROID_MAX_RADIUS),
+            pygame.Vector2(SCREEN_WIDTH, 0),
+        ),
+        (
             pygame.Vector2(0, -1),
-            lambda x: pygame.Vector2(
-                x * SCREEN_WIDTH, SCREEN_HEIGHT + ASTEROID_MAX_RADIUS
-            ),
-        ],
+            pygame.Vector2(0, SCREEN_HEIGHT + ASTEROID_MAX_RADIUS),
+            pygame.Vector2(SCREEN_WIDTH, 0),
+        ),
     ]
 
     def __init__(self):
         pygame.sprite.Sprite.__init__(self, self.containers)
         self.spawn_timer = 0.0
 
-    def spawn(self, radius, position, velocity):
-        asteroid = Asteroid(position.x, position.y, radius)
-        asteroid.velocity = velocity
+    def spawn_batch(self, count):
+        """
+        Spawn `count` asteroids at random edges in one batch.
+
+        Returns:
+            list: The new asteroids
+        """
+        choice = random.choice
+        randint = random.randint
+        uniform = random.uniform
+        spawns = []
+        for _ in range(count):
+            direction, origin, span = choice(self.edges)
+            speed = randint(40, 100)
+            velocity = (direction * speed).rotate(randint(-30, 30))
+            position = origin + span * uniform(0, 1)
+            if SCREEN_WRAP:
+                # On the seam instead of past it, or it would wrap straight to the far edge
+                position += direction * ASTEROID_MAX_RADIUS
+                position.update(position.x % SCREEN_WIDTH, position.y % SCREEN_HEIGHT)
+            kind = randint(1, ASTEROID_KINDS)
+            spawns.append((position.x, position.y, ASTEROID_MIN_RADIUS * kind, velocity))
+        return Asteroid.spawn_batch(spawns)
 
     def update(self, dt):
         self.spawn_timer += dt
         if self.spawn_timer > ASTEROID_SPAWN_RATE_SECONDS:
+            # Every spawn due this step comes out together, so spawn rates
+            # above the frame rate aren't capped at one asteroid per frame
+            count = int(self.spawn_timer // ASTEROID_SPAWN_RATE_SECONDS)
             self.spawn_timer = 0
-
-            # spawn a new asteroid at a random edge
-            edge = random.choice(self.edges)
-            speed = random.randint(40, 100)
-            velocity = edge[0] * speed
-            velocity = velocity.rotate(random.randint(-30, 30))
-            position = edge[1](random.uniform(0, 1))
-            kind = random.randint(1, ASTEROID_KINDS)
-            self.spawn(ASTEROID_MIN_RADIUS * kind, position, velocity)
\ No newline at end of file
+            if SCREEN_WRAP:
+                # Wrapped asteroids never drift off screen, so only the cap keeps their number down
+                count = min(count, WRAP_MAX_ASTEROIDS - len(self.asteroids))
+            if count > 0:
+                self.spawn_batch(count)
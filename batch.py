@@ -0,0 +1,274 @@
+import argparse
+import contextlib
+import csv
+import hashlib
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# Columns of CSV output; JSONL lines carry the same fields, with params and peaks nested
+_CSV_FIELDS = [
+    "run_id",
+    "params",
+    "policy",
+    "seed",
+    "frames",
+    "simulated_s",
+    "score",
+    "lives",
+    "game_over",
+    "peak_asteroids",
+    "peak_shots",
+    "peak_ufos",
+    "peak_ufo_shots",
+    "elapsed_s",
+]
+
+
+# Constants the game reads at call time, so rebinding them reaches every run.
+# The rest are read once at import (class attributes, default arguments,
+# sprite base classes and pools), feed other constants, or only matter to the
+# windowed game; sweeping them would quietly give identical runs.
+_SWEEPABLE = {
+    "PLAYER_RADIUS",
+    "PLAYER_TURN_SPEED",
+    "PLAYER_SPEED",
+    "PLAYER_LIVES",
+    "PLAYER_SHOT_SPEED",
+    "SHOT_RADIUS",
+    "ASTEROID_SPAWN_RATE_SECONDS",
+    "ASTEROID_SCORES",
+    "UFO_RADIUS",
+    "UFO_SPEED",
+    "UFO_SHOT_SPEED",
+    "UFO_SPAWN_RATE_SECONDS",
+    "UFO_SCORE",
+    "WRAP_MAX_ASTEROIDS",
+    "USE_ENTITY_STORE",
+    "SWEPT_COLLISIONS",
+}
+
+
+def _check_sweepable(names):
+    """
+    Make sure every name is a constant a sweep can change.
+
+    Raises:
+        KeyError: A name is not in constants.py
+        ValueError: A name is in constants.py but overriding it can't change a run
+    """
+    import constants
+
+    for name in names:
+        if not hasattr(constants, name):
+            raise KeyError(f"constants.py has no {name}")
+        if name not in _SWEEPABLE:
+            raise ValueError(
+                f"{name} can't be swept: it is fixed at import, derived from other constants "
+                f"or unused by headless runs. Sweepable: {', '.join(sorted(_SWEEPABLE))}"
+            )
+
+
+def expand_runs(spec):
+    """
+    Every run of a sweep: the cartesian product of the parameter grid,
+    policies and seeds.
+
+    Args:
+        spec: {"grid": {CONSTANT: [values]}, "policies": [...], "seeds": int or list, "frames": int}
+
+    Returns:
+        list: Run dicts with a stable `run_id`, so finished runs can be recognised on resume
+    """
+    grid = spec.get("grid", {})
+    names = sorted(grid)
+    _check_sweepable(names)
+    seeds = spec.get("seeds", 1)
+    if isinstance(seeds, int):
+        seeds = range(seeds)
+    frames = spec.get("frames", 36000)
+
+    runs = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        for policy in spec.get("policies", ["random"]):
+            for seed in seeds:
+                key = json.dumps([params, policy, seed, frames], sort_keys=True)
+                runs.append({
+                    "run_id": hashlib.sha1(key.encode()).hexdigest()[:12],
+                    "params": params,
+                    "policy": policy,
+                    "seed": seed,
+                    "frames": frames,
+                })
+    return runs
+
+
+def _apply_overrides(params):
+    # Game modules copy constants in with `from constants import ...`, so rebind
+    # the name wherever it was imported
+    import constants
+
+    _check_sweepable(params)
+    saved = []
+    for name, value in params.items():
+        original = getattr(constants, name)
+        if isinstance(value, list):
+            value = tuple(value)
+        for module in list(sys.modules.values()):
+            if getattr(module, name, None) is original and module.__dict__.get(name) is original:
+                saved.append((module, name, original))
+                setattr(module, name, value)
+    return saved
+
+
+# Directory batch.py was started from; script policies are relative to it
+_launch_dir = None
+
+
+def _make_inputs(policy, seed):
+    from controls import RandomInput, ScriptedInput
+
+    if policy == "idle":
+        return ScriptedInput([])
+    if policy == "random":
+        return RandomInput(seed)
+    # Anything else is a JSON input script, as for headless.py --script
+    with open(os.path.join(_launch_dir or "", policy), "r") as f:
+        return ScriptedInput.from_names(json.load(f), loop=True)
+
+
+def _init_worker(launch_dir):
+    global _launch_dir
+    _launch_dir = launch_dir
+    # The game logs into the working directory; give each worker its own
+    os.chdir(tempfile.mkdtemp(prefix="asteroids-batch-"))
+
+
+def simulate(run):
+    """
+    Play one run headless in this process.
+
+    Returns:
+        dict: The run with its run_headless summary merged in
+    """
+    from headless import run_headless
+
+    inputs = _make_inputs(run["policy"], run["seed"])
+    saved = _apply_overrides(run["params"])
+    try:
+        # Respawn and game over prints from every worker would flood the terminal
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run_headless(run["frames"], seed=run["seed"], inputs=inputs)
+    finally:
+        for module, name, original in saved:
+            setattr(module, name, original)
+    for key in ("seed", "dt", "fps"):
+        result.pop(key)
+    return {**run, **result}
+
+
+def _drop_torn_line(path):
+    # A run cut off mid-write leaves a partial last line. A torn CSV row can
+    # still carry its run_id, so remove the line to have the run redone.
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def _finished_runs(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", newline="") as f:
+        if path.endswith(".csv"):
+            return {row["run_id"] for row in csv.DictReader(f)}
+        finished = set()
+        for line in f:
+            try:
+                finished.add(json.loads(line)["run_id"])
+            except (json.JSONDecodeError, KeyError):
+                # Not a run summary; that run is simply redone
+                continue
+        return finished
+
+
+def _csv_row(result):
+    row = {field: result.get(field) for field in _CSV_FIELDS}
+    row["params"] = json.dumps(result["params"], sort_keys=True)
+    for group, peak in result["peak_entities"].items():
+        row[f"peak_{group}"] = peak
+    return row
+
+
+def run_batch(spec, output, workers=None):
+    """
+    Run every not yet finished run of `spec` across a process pool, appending
+    each summary to `output` (JSONL, or CSV if it ends in .csv) as soon as it
+    completes. Re-running the same command after an interruption resumes it.
+
+    Returns:
+        tuple: (runs completed now, runs skipped as already finished)
+    """
+    runs = expand_runs(spec)
+    _drop_torn_line(output)
+    finished = _finished_runs(output)
+    pending = [run for run in runs if run["run_id"] not in finished]
+
+    as_csv = output.endswith(".csv")
+    new_file = not os.path.exists(output) or os.path.getsize(output) == 0
+    completed = 0
+    with open(output, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=_CSV_FIELDS) if as_csv else None
+        if as_csv and new_file:
+            writer.writeheader()
+        pool = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(os.getcwd(),),
+        )
+        with pool:
+            futures = [pool.submit(simulate, run) for run in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                if as_csv:
+                    writer.writerow(_csv_row(result))
+                else:
+                    f.write(json.dumps(result) + "\n")
+                # Flushed per run so an interruption loses at most the runs in flight
+                f.flush()
+                completed += 1
+                print(
+                    f"[{completed}/{len(pending)}] {result['run_id']} {result['policy']} seed {result['seed']}: "
+                    f"score {result['score']}, survived {result['simulated_s']} s"
+                )
+    return completed, len(runs) - len(pending)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep constants.py values over headless simulated games.")
+    parser.add_argument(
+        "spec",
+        help='JSON sweep spec, e.g. {"grid": {"PLAYER_SHOT_SPEED": [400, 500]}, '
+        '"policies": ["random", "idle"], "seeds": 8, "frames": 36000}',
+    )
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL or .csv file to append runs to")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    with open(args.spec, "r") as f:
+        spec = json.load(f)
+    completed, skipped = run_batch(spec, os.path.abspath(args.output), args.workers)
+    print(f"{completed} runs completed, {skipped} already finished; results in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
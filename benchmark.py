@@ -0,0 +1,306 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import logger
+from constants import (
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+    ASTEROID_MIN_RADIUS,
+    ASTEROID_KINDS,
+    SHOT_RADIUS,
+    PLAYER_SHOT_SPEED,
+    HEADLESS_DT,
+    BATCHED_RENDERING,
+)
+from controls import ScriptedInput
+from game import Game
+from player import Player
+from asteroid import Asteroid
+from shot import Shot
+from ufo import UFO
+from render import Renderer
+from assets import BACKGROUND_IMAGE, load_scaled_image
+
+# Entity populations kept topped up for every frame of a scenario
+SCENARIOS = {
+    "asteroids_50": {"asteroids": 50, "shots": 0, "ufos": 0},
+    "asteroids_500": {"asteroids": 500, "shots": 0, "ufos": 0},
+    "asteroids_5000": {"asteroids": 5000, "shots": 0, "ufos": 0},
+    "shot_storm": {"asteroids": 200, "shots": 1000, "ufos": 0},
+    "ufo_wave": {"asteroids": 50, "shots": 100, "ufos": 30},
+}
+
+# The phases Game.step() marks, in its order, then rendering and logging
+PHASES = ["update", *Game.COLLISION_PASSES, "resolve_hits", "draw", "log_state", "log_event"]
+
+# Phases faster than this are timer noise and never count as regressions
+_NOISE_FLOOR_MS = 0.05
+
+
+def _random_velocity(speed):
+    return pygame.Vector2(0, 1).rotate(random.uniform(0, 360)) * speed
+
+
+def _random_position():
+    return random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT)
+
+
+def _top_up(game, population):
+    spawns = []
+    for _ in range(population["asteroids"] - len(game.asteroids)):
+        x, y = _random_position()
+        radius = ASTEROID_MIN_RADIUS * random.randint(1, ASTEROID_KINDS)
+        spawns.append((x, y, radius, _random_velocity(random.randint(40, 100))))
+    Asteroid.spawn_batch(spawns)
+    while len(game.shots) < population["shots"]:
+        x, y = _random_position()
+        shot = Shot.spawn(x, y, SHOT_RADIUS)
+        shot.velocity = _random_velocity(PLAYER_SHOT_SPEED)
+    while len(game.ufos) < population["ufos"]:
+        x, y = _random_position()
+        ufo = UFO(x, y, random.choice([1, -1]))
+        ufo.player = game.player
+
+
+def _percentiles(samples):
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "mean": round(statistics.fmean(samples), 4),
+        "p50": round(cuts[49], 4),
+        "p95": round(cuts[94], 4),
+        "p99": round(cuts[98], 4),
+    }
+
+
+def run_scenario(name, frames, seed, screen, renderer):
+    """
+    Time each phase of the frame pipeline for one scenario.
+
+    Returns:
+        dict: p50/p95/p99 frame and per-phase times in milliseconds, draw calls
+        per frame and peak entity counts
+    """
+    population = SCENARIOS[name]
+    random.seed(seed)
+    logger._frame_count = 0
+    game = Game()
+    # Park the player outside the playfield so hits don't respawn away the population
+    game.player.position = pygame.Vector2(-10 * SCREEN_WIDTH, -10 * SCREEN_HEIGHT)
+
+    timings = {phase: [] for phase in PHASES}
+    frame_times = []
+    draw_calls = []
+    peaks = {"asteroids": 0, "shots": 0, "ufos": 0, "ufo_shots": 0}
+    clock = time.perf_counter
+    marks = []
+
+    def mark(phase):
+        marks.append((phase, clock()))
+
+    for _ in range(frames):
+        _top_up(game, population)
+        for group in peaks:
+            peaks[group] = max(peaks[group], len(getattr(game, group)))
+
+        marks.clear()
+        start = clock()
+        # The game's own pipeline, so the timed passes always match a real frame
+        game.step(HEADLESS_DT, mark)
+        screen.fill("black")
+        draw_calls.append(renderer.draw(screen, game.drawable))
+        mark("draw")
+        logger.log_state()
+        mark("log_state")
+        logger.log_event("benchmark_frame", scenario=name)
+        mark("log_event")
+
+        previous = start
+        for phase, end in marks:
+            timings[phase].append((end - previous) * 1000)
+            previous = end
+        frame_times.append((previous - start) * 1000)
+
+    return {
+        "frames": frames,
+        "population": population,
+        "peak_entities": peaks,
+        "frame_ms": _percentiles(frame_times),
+        "draw_calls": _percentiles(draw_calls),
+        "phases_ms": {phase: _percentiles(samples) for phase, samples in timings.items()},
+    }
+
+
+def run_startup(source, repeats, screen):
+    """
+    Time loading the background the way startup used to (decode, scale, no
+    convert) against the asset cache, cold and warm, and the cost of blitting
+    each result to the screen.
+
+    Returns:
+        dict: Load and blit timings in milliseconds per variant
+    """
+    size = screen.get_size()
+    clock = time.perf_counter
+    loads = {"uncached": [], "cache_cold": [], "cache_warm": []}
+    images = {}
+    for _ in range(repeats):
+        start = clock()
+        images["uncached"] = pygame.transform.scale(pygame.image.load(source), size)
+        loads["uncached"].append((clock() - start) * 1000)
+
+        cache_dir = tempfile.mkdtemp(prefix="asteroids-assets-")
+        start = clock()
+        images["cache_cold"], _ = load_scaled_image(source, size, cache_dir)
+        loads["cache_cold"].append((clock() - start) * 1000)
+        start = clock()
+        images["cache_warm"], _ = load_scaled_image(source, size, cache_dir)
+        loads["cache_warm"].append((clock() - start) * 1000)
+        shutil.rmtree(cache_dir)
+
+    results = {}
+    for variant, samples in loads.items():
+        blits = []
+        for _ in range(repeats):
+            start = clock()
+            screen.blit(images[variant], (0, 0))
+            blits.append((clock() - start) * 1000)
+        results[variant] = {"load_ms": _percentiles(samples), "blit_ms": _percentiles(blits)}
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare p50/p95 times against a baseline run.
+
+    Returns:
+        list: Human-readable regression lines; empty if nothing got slower than `tolerance`
+    """
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        metrics = [("frame", current["frame_ms"], previous["frame_ms"])]
+        for phase, stats in current["phases_ms"].items():
+            if phase in previous["phases_ms"]:
+                metrics.append((phase, stats, previous["phases_ms"][phase]))
+        for label, now, before in metrics:
+            for key in ("p50", "p95"):
+                if before[key] < _NOISE_FLOOR_MS:
+                    continue
+                ratio = now[key] / before[key]
+                if ratio > 1 + tolerance:
+                    regressions.append(
+                        f"{name} {label} {key}: {before[key]:.4f} -> {now[key]:.4f} ms ({ratio:.2f}x)"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Asteroids frame pipeline.")
+    parser.add_argument("--frames", type=int, default=200, help="frames per scenario")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="scenario to run (repeatable, default: all)",
+    )
+    parser.add_argument(
+        "--asteroid-render",
+        choices=["pool", "vector"],
+        default="pool" if Asteroid.use_shape_pool else "vector",
+        help="draw asteroids from the pre-rendered shape pool or as per-frame polygons",
+    )
+    parser.add_argument(
+        "--render",
+        choices=["batched", "immediate"],
+        default="batched" if BATCHED_RENDERING else "immediate",
+        help="submit pre-rendered sprites in one blits() call or draw each sprite on its own",
+    )
+    parser.add_argument(
+        "--startup",
+        type=int,
+        default=0,
+        metavar="REPEATS",
+        help="also time background loading with and without the asset cache",
+    )
+    parser.add_argument("--output", default="bench_results.json", help="where to write results")
+    parser.add_argument("--baseline", help="baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown ratio")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    logger.set_screen_size(screen.get_size())
+    keyboard = Player.input_source
+    Player.input_source = ScriptedInput([])
+    Asteroid.use_shape_pool = args.asteroid_render == "pool"
+    renderer = Renderer(batched=args.render == "batched")
+    background = os.path.abspath(BACKGROUND_IMAGE)
+    # The logger writes into the working directory; keep benchmark logs out of the repo
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="asteroids-bench-"))
+    try:
+        results = {
+            "meta": {
+                "python": platform.python_version(),
+                "pygame": pygame.version.ver,
+                "frames": args.frames,
+                "seed": args.seed,
+                "asteroid_render": args.asteroid_render,
+                "render": args.render,
+            },
+            "scenarios": {},
+        }
+        for name in args.scenario or SCENARIOS:
+            result = run_scenario(name, args.frames, args.seed, screen, renderer)
+            results["scenarios"][name] = result
+            frame = result["frame_ms"]
+            print(
+                f"{name:>16}: p50 {frame['p50']:8.3f} ms  p95 {frame['p95']:8.3f} ms  p99 {frame['p99']:8.3f} ms"
+                f"  draw calls {result['draw_calls']['p50']:.0f}"
+            )
+        if args.startup:
+            results["startup"] = run_startup(background, args.startup, screen)
+            for variant, timing in results["startup"].items():
+                print(
+                    f"{'startup ' + variant:>16}: load p50 {timing['load_ms']['p50']:8.3f} ms"
+                    f"  blit p50 {timing['blit_ms']['p50']:6.3f} ms"
+                )
+    finally:
+        os.chdir(cwd)
+        Player.input_source = keyboard
+        pygame.quit()
+
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
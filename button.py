@@ -1,4 +1,5 @@
 import pygame
+from textcache import text_cache, get_font
 
 
 class Button:
@@ -22,7 +23,7 @@ class Button:
         self.color = color
         self.hover_color = hover_color
         self.text_color = text_color
-        self.font = pygame.font.Font(None, font_size)
+        self.font = get_font(font_size)
         self.is_hovered = False
         self.was_clicked = False
         
@@ -62,7 +63,7 @@ class Button:
         pygame.draw.rect(screen, current_color, self.rect)
         pygame.draw.rect(screen, self.text_color, self.rect, 2)  # Border
         
-        # Render and center text
-        text_surface = self.font.render(self.text, True, self.text_color)
+        # Center the (cached) label text
+        text_surface = text_cache.render(self.font, self.text, self.text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
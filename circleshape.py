@@ -1,7 +1,67 @@
 import pygame
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, OFFSCREEN_MARGIN, LINE_WIDTH, USE_LIGHT_ENTITIES, SCREEN_WRAP
+from entity import Entity
+from world import wrap_offset
+
+
+class ReclaimCounter:
+    def __init__(self):
+        """
+        Count sprites killed by the bounds/lifetime policy.
+
+        `per_second` is refreshed every time a one-second window closes in `tick`.
+        """
+        self.total = 0
+        self.per_second = 0.0
+        self._window_count = 0
+        self._window_elapsed = 0.0
+
+    def record(self):
+        self.total += 1
+        self._window_count += 1
+
+    def tick(self, dt):
+        """
+        Advance the measurement window.
+
+        Returns:
+            True if a window just closed and `per_second` was updated
+        """
+        self._window_elapsed += dt
+        if self._window_elapsed < 1.0:
+            return False
+        self.per_second = self._window_count / self._window_elapsed
+        self._window_count = 0
+        self._window_elapsed = 0.0
+        return True
+
+
+reclaim_counter = ReclaimCounter()
+
+
+# Chosen at import: every game object class derives from it
+if USE_LIGHT_ENTITIES:
+    SpriteBase = Entity
+else:
+    SpriteBase = pygame.sprite.Sprite
+
 
 # Base class for game objects
-class CircleShape(pygame.sprite.Sprite):
+class CircleShape(SpriteBase):
+    # Without a __dict__ when SpriteBase is Entity; harmless on top of pygame's Sprite
+    __slots__ = ("position", "velocity", "radius", "age")
+
+    # Distance past the screen edge (on top of the radius) before a sprite is reclaimed
+    offscreen_margin = OFFSCREEN_MARGIN
+    # Seconds a sprite may live, None for no limit
+    max_lifetime = None
+    # SpritePool that recycles killed instances of this class, see spawn()
+    pool = None
+    # Seconds drawing trails the simulation; set by fixed-timestep loops, see render_position()
+    render_lag = 0.0
+    # Offset added while a renderer draws a wrapped sprite's copy at the opposite edge
+    render_shift = None
+
     def __init__(self, x, y, radius):
         # we will be using this later
         if hasattr(self, "containers"):
@@ -12,14 +72,129 @@ class CircleShape(pygame.sprite.Sprite):
         self.position = pygame.Vector2(x, y)
         self.velocity = pygame.Vector2(0, 0)
         self.radius = radius
+        self.age = 0.0
+
+    @classmethod
+    def spawn(cls, *args):
+        """
+        Create a sprite like cls(*args), reusing a dead instance from the
+        class's pool when there is one.
+        """
+        pool = cls.pool
+        if pool is None or pool.cls is not cls:
+            return cls(*args)
+        return pool.acquire(*args)
+
+    def reset(self, x, y, radius):
+        # Bring a pooled sprite back to the state __init__ leaves it in
+        self.position.update(x, y)
+        self.velocity.update(0, 0)
+        self.radius = radius
+        self.age = 0.0
+
+    def kill(self):
+        if self.pool is not None and self.alive():
+            super().kill()
+            self.pool.release(self)
+        else:
+            super().kill()
 
     def draw(self, screen):
         # must override
         pass
 
+    def render_position(self):
+        """
+        Where to draw the sprite: `render_lag` seconds back along its
+        velocity, which interpolates between the last two simulation ticks.
+        """
+        lag = CircleShape.render_lag
+        position = self.position - self.velocity * lag if lag else self.position
+        shift = CircleShape.render_shift
+        if shift is not None:
+            return position + shift
+        return position
+
+    def blit_image(self):
+        """
+        Pre-rendered image for batched drawing.
+
+        Returns:
+            tuple: (surface, half) where `half` is the offset from the center
+            to the top-left corner, or None to be drawn through draw()
+        """
+        return None
+
+    def blit_source(self):
+        """
+        blit_image() placed at the render position.
+
+        Returns:
+            tuple: (surface, topleft) for screen.blits(), or None to be drawn through draw()
+        """
+        image = self.blit_image()
+        if image is None:
+            return None
+        surface, half = image
+        position = self.render_position()
+        return surface, (position.x - half, position.y - half)
+
+    def bounds(self):
+        """
+        Screen area that draw() may paint: the outline can reach past the
+        radius (asteroid jitter, UFO body, player triangle corners).
+
+        Returns:
+            pygame.Rect
+        """
+        reach = int(self.radius * 1.25) + LINE_WIDTH + 1
+        position = self.render_position()
+        return pygame.Rect(int(position.x) - reach, int(position.y) - reach, reach * 2, reach * 2)
+
     def update(self, dt):
         # must override
         pass
 
+    def is_offscreen(self):
+        margin = self.offscreen_margin + self.radius
+        return (
+            self.position.x < -margin
+            or self.position.x > SCREEN_WIDTH + margin
+            or self.position.y < -margin
+            or self.position.y > SCREEN_HEIGHT + margin
+        )
+
+    def wrap(self):
+        # Back in at the opposite edge once the center leaves the screen
+        position = self.position
+        if not (0 <= position.x < SCREEN_WIDTH and 0 <= position.y < SCREEN_HEIGHT):
+            self.position = pygame.Vector2(position.x % SCREEN_WIDTH, position.y % SCREEN_HEIGHT)
+
+    def expire(self, dt):
+        """
+        Age the sprite and kill it once it leaves the play area or outlives
+        `max_lifetime`. Subclasses call this at the end of `update`. With
+        SCREEN_WRAP nothing leaves the play area: the sprite wraps around
+        instead and only its lifetime can run out.
+
+        Returns:
+            True if the sprite was killed
+        """
+        self.age += dt
+        if SCREEN_WRAP:
+            self.wrap()
+            offscreen = False
+        else:
+            offscreen = self.is_offscreen()
+        if offscreen or (self.max_lifetime is not None and self.age > self.max_lifetime):
+            self.kill()
+            reclaim_counter.record()
+            return True
+        return False
+
     def collides_with(self, other):
-        return self.radius + other.radius >= self.position.distance_to(other.position)
\ No newline at end of file
+        reach = self.radius + other.radius
+        if SCREEN_WRAP:
+            # The short way around the screen, as in collision.circles_overlap()
+            return reach * reach >= wrap_offset(other.position - self.position).length_squared()
+        return reach * reach >= self.position.distance_squared_to(other.position)
\ No newline at end of file
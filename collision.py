@@ -0,0 +1,285 @@
+from collections import deque
+from constants import COLLISION_CELL_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_WRAP
+from entitystore import stored_slots
+from world import wrap_offset
+
+
+def circles_overlap(a, b):
+    """
+    Narrow-phase circle test on squared distances (no sqrt). With
+    SCREEN_WRAP the distance is measured the short way around the screen.
+
+    Args:
+        a: Object with position (pygame.Vector2) and radius
+        b: Object with position (pygame.Vector2) and radius
+
+    Returns:
+        True if the two circles touch or overlap
+    """
+    reach = a.radius + b.radius
+    if SCREEN_WRAP:
+        return wrap_offset(b.position - a.position).length_squared() <= reach * reach
+    return a.position.distance_squared_to(b.position) <= reach * reach
+
+
+class SpatialGrid:
+    def __init__(self, sprites, cell_size=COLLISION_CELL_SIZE, bounds=None, wrap=None):
+        """
+        Uniform-grid broad phase. Every sprite is bucketed into each cell its
+        bounding box overlaps, so a query only has to look at nearby cells.
+
+        Args:
+            sprites: Iterable of objects with position and radius
+            cell_size: Width and height of a grid cell in pixels
+            bounds: Optional callable returning the (position, radius) circle
+                to bucket a sprite by, instead of its own
+            wrap: Treat the screen as a torus: the grid tiles it exactly and
+                cell coordinates are taken modulo its columns and rows, so a
+                box hanging over one edge lands in the cells at the opposite
+                one. Defaults to SCREEN_WRAP
+        """
+        if wrap is None:
+            wrap = SCREEN_WRAP
+        self.cells = {}
+        self.wrap = wrap
+        if wrap:
+            self.columns = max(1, round(SCREEN_WIDTH / cell_size))
+            self.rows = max(1, round(SCREEN_HEIGHT / cell_size))
+            self.cell_width = SCREEN_WIDTH / self.columns
+            self.cell_height = SCREEN_HEIGHT / self.rows
+        else:
+            self.cell_width = self.cell_height = cell_size
+        for index, sprite in enumerate(sprites):
+            if bounds is None:
+                position, radius = sprite.position, sprite.radius
+            else:
+                position, radius = bounds(sprite)
+            for cell in self._cells_for(position, radius):
+                bucket = self.cells.get(cell)
+                if bucket is None:
+                    self.cells[cell] = [(index, sprite)]
+                else:
+                    bucket.append((index, sprite))
+
+    def _cells_for(self, position, radius):
+        width = self.cell_width
+        height = self.cell_height
+        min_x = int((position.x - radius) // width)
+        max_x = int((position.x + radius) // width)
+        min_y = int((position.y - radius) // height)
+        max_y = int((position.y + radius) // height)
+        if not self.wrap:
+            for cell_x in range(min_x, max_x + 1):
+                for cell_y in range(min_y, max_y + 1):
+                    yield cell_x, cell_y
+            return
+        columns = self.columns
+        rows = self.rows
+        # A box wider than the screen covers every column once, not twice
+        xs = range(min_x, min(max_x, min_x + columns - 1) + 1)
+        ys = range(min_y, min(max_y, min_y + rows - 1) + 1)
+        for cell_x in xs:
+            for cell_y in ys:
+                yield cell_x % columns, cell_y % rows
+
+    def query(self, sprite):
+        """
+        Candidate sprites that share at least one cell with `sprite`.
+
+        Returns:
+            list: Candidates in the order they were inserted into the grid
+        """
+        return self.query_circle(sprite.position, sprite.radius)
+
+    def query_circle(self, position, radius):
+        """
+        Candidate sprites that share at least one cell with a circle's bounding box.
+
+        Returns:
+            list: Candidates in the order they were inserted into the grid
+        """
+        found = {}
+        for cell in self._cells_for(position, radius):
+            for index, other in self.cells.get(cell, ()):
+                found[index] = other
+        return [found[index] for index in sorted(found)]
+
+
+def collision_pairs(group_a, group_b):
+    """
+    All overlapping (a, b) pairs between two groups.
+
+    Pairs come out in the same order as a nested `for a in group_a: for b in
+    group_b` loop would find them, so callers can keep first-hit semantics.
+    Groups held by an EntityStore are tested in one vectorized pass.
+    """
+    sprites_a = list(group_a)
+    sprites_b = list(group_b)
+    if not sprites_a or not sprites_b:
+        return []
+    store, slots_a = stored_slots(sprites_a)
+    if store is not None:
+        other_store, slots_b = stored_slots(sprites_b)
+        if other_store is store:
+            return [(sprites_a[i], sprites_b[j]) for i, j in store.collision_pairs(slots_a, slots_b)]
+
+    grid = SpatialGrid(sprites_b)
+    pairs = []
+    for a in sprites_a:
+        for b in grid.query(a):
+            if circles_overlap(a, b):
+                pairs.append((a, b))
+    return pairs
+
+
+def collisions_with(sprite, group):
+    """
+    Members of `group` overlapping a single sprite, in group order.
+
+    A grid would cost as much to build as this single scan, so one-off
+    queries (like the player) go straight to the narrow phase.
+    """
+    others = list(group)
+    store, slots = stored_slots(others)
+    if store is not None:
+        return [others[i] for i in store.overlapping(slots, sprite.position, sprite.radius)]
+    return [other for other in others if circles_overlap(sprite, other)]
+
+
+def swept_overlap(target, mover, sweep):
+    """
+    Continuous circle test: did `mover` touch `target` at any point of the
+    last `sweep` seconds? Both are taken to have moved at their current
+    velocity, so a fast shot can't skip over a small asteroid between frames.
+
+    Args:
+        target: Object with position, velocity and radius
+        mover: Object with position, velocity and radius
+        sweep: Seconds of motion to look back over
+
+    Returns:
+        True if the circles touched during the sweep
+    """
+    reach = target.radius + mover.radius
+    # The mover's offset from the target now, and how far it moved relative to it
+    offset = mover.position - target.position
+    if SCREEN_WRAP:
+        offset = wrap_offset(offset)
+    motion = (mover.velocity - target.velocity) * sweep
+    length_squared = motion.length_squared()
+    if length_squared > 0:
+        s = min(1.0, max(0.0, offset.dot(motion) / length_squared))
+        offset -= motion * s
+    return offset.length_squared() <= reach * reach
+
+
+def _swept_bounds(sprite, sweep):
+    # Circle around everything the sprite covered during the sweep
+    half = sprite.velocity * (sweep / 2)
+    return sprite.position - half, sprite.radius + half.length()
+
+
+def swept_collision_pairs(targets, movers, dt):
+    """
+    collision_pairs() with a swept test: every mover is traced back over the
+    last min(dt, age) seconds, its motion this frame, relative to each target.
+
+    Returns:
+        list: Overlapping (target, mover) pairs, in nested loop order
+    """
+    sprites_a = list(targets)
+    sprites_b = list(movers)
+    if not sprites_a or not sprites_b:
+        return []
+    store, slots_a = stored_slots(sprites_a)
+    if store is not None:
+        other_store, slots_b = stored_slots(sprites_b)
+        if other_store is store:
+            return [(sprites_a[i], sprites_b[j]) for i, j in store.swept_collision_pairs(slots_a, slots_b, dt)]
+
+    # Per mover: its sweep and the circle around its path, which also buckets it in the grid
+    swept = {}
+    for b in sprites_b:
+        sweep = min(b.age, dt)
+        swept[b] = (sweep, *_swept_bounds(b, sweep))
+    grid = SpatialGrid(sprites_b, bounds=lambda b: swept[b][1:])
+    pairs = []
+    for a in sprites_a:
+        center, reach = _swept_bounds(a, dt)
+        for b in grid.query_circle(center, reach):
+            sweep, other_center, other_reach = swept[b]
+            # Paths whose bounding circles don't touch can't have met
+            limit = reach + other_reach
+            between = other_center - center
+            if SCREEN_WRAP:
+                between = wrap_offset(between)
+            if between.length_squared() <= limit * limit and swept_overlap(a, b, sweep):
+                pairs.append((a, b))
+    return pairs
+
+
+def swept_collisions_with(sprite, movers, dt):
+    """
+    collisions_with() with a swept test of every mover, see swept_collision_pairs().
+
+    Returns:
+        list: Movers that touched `sprite` this frame, in group order
+    """
+    others = list(movers)
+    store, slots = stored_slots(others)
+    if store is not None:
+        hits = store.swept_overlapping(slots, sprite.position, sprite.velocity, sprite.radius, dt)
+        return [others[i] for i in hits]
+    return [other for other in others if swept_overlap(sprite, other, min(other.age, dt))]
+
+
+class CollisionDispatcher:
+    def __init__(self):
+        """
+        Collision responses keyed on the (type, type) pair of the sprites that
+        hit. Detection only queues hits; resolve() runs the responses once,
+        after every pass of the frame has seen the same, unchanged world.
+        """
+        self._responses = {}
+        self._hits = deque()
+
+    def register(self, type_a, type_b, response):
+        """
+        Args:
+            type_a: Class of the first sprite of a hit
+            type_b: Class of the second sprite of a hit
+            response: Callable taking (a, b)
+        """
+        self._responses[(type_a, type_b)] = response
+
+    def queue_pairs(self, pairs):
+        self._hits.extend(pairs)
+
+    def clear(self):
+        """
+        Drop every queued hit, e.g. because a response replaced the world they
+        belong to.
+        """
+        self._hits.clear()
+
+    def resolve(self):
+        """
+        Run the response of every queued hit in order. Hits with a sprite
+        killed by an earlier response this frame are skipped.
+
+        Returns:
+            int: Number of responses run
+        """
+        hits = self._hits
+        responses = self._responses
+        resolved = 0
+        while hits:
+            a, b = hits.popleft()
+            if not a.alive() or not b.alive():
+                continue
+            responses[(type(a), type(b))](a, b)
+            resolved += 1
+        return resolved
+
+    def __len__(self):
+        return len(self._hits)
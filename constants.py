@@ -4,10 +4,14 @@ PLAYER_RADIUS = 20
 LINE_WIDTH = 2
 PLAYER_TURN_SPEED = 300
 PLAYER_SPEED = 200
+PLAYER_LIVES = 3
 ASTEROID_MIN_RADIUS = 20
 ASTEROID_KINDS = 3
 ASTEROID_SPAWN_RATE_SECONDS = 0.8
 ASTEROID_MAX_RADIUS = ASTEROID_MIN_RADIUS * ASTEROID_KINDS
+ASTEROID_SCORES = (100, 50, 20)
+ASTEROID_SHAPE_POOL = True
+ASTEROID_SHAPE_VARIANTS = 8
 SHOT_RADIUS = 5
 PLAYER_SHOT_SPEED = 500
 UFO_RADIUS = 18
@@ -15,3 +19,27 @@ UFO_SPEED = 140
 UFO_SHOT_SPEED = 260
 UFO_SPAWN_RATE_SECONDS = 20.0
 UFO_SCORE = 200
+OFFSCREEN_MARGIN = ASTEROID_MAX_RADIUS
+SHOT_LIFETIME_SECONDS = 3.0
+USE_ENTITY_STORE = False
+HEADLESS_DT = 1 / 60
+LOG_BACKGROUND_WRITER = False
+LOG_QUEUE_SIZE = 4096
+LOG_QUEUE_POLICY = "drop_oldest"
+COLLISION_CELL_SIZE = ASTEROID_MAX_RADIUS * 2
+SWEPT_COLLISIONS = True
+BATCHED_RENDERING = True
+DIRTY_RECT_RENDERING = False
+DIRTY_RECT_THRESHOLD = 0.35
+USE_SPRITE_POOLS = True
+SPRITE_POOL_MAX_SIZE = 512
+USE_LIGHT_ENTITIES = False
+RECORD_REPLAYS = True
+REPLAY_DIR = "replays"
+PROFILE_HISTORY = 300
+FIXED_TIMESTEP = True
+PHYSICS_TICK_RATE = 120
+RENDER_FPS = 60
+MAX_SUBSTEPS = 8
+SCREEN_WRAP = False
+WRAP_MAX_ASTEROIDS = 30
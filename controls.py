@@ -0,0 +1,134 @@
+import random
+import pygame
+
+# Keys read by Player.update, by name. The order fixes each key's bit in an input mask.
+KEYS = {
+    "a": pygame.K_a,
+    "d": pygame.K_d,
+    "w": pygame.K_w,
+    "s": pygame.K_s,
+    "space": pygame.K_SPACE,
+    "lshift": pygame.K_LSHIFT,
+    "escape": pygame.K_ESCAPE,
+}
+_KEY_BITS = {key: bit for bit, key in enumerate(KEYS.values())}
+
+
+def names_to_bits(names):
+    """
+    Convert key names (see KEYS) to an input bitmask.
+    """
+    bits = 0
+    for name in names:
+        bits |= 1 << _KEY_BITS[KEYS[name]]
+    return bits
+
+
+def state_to_bits(pressed):
+    """
+    Convert a pygame.key.get_pressed() result to an input bitmask of the KEYS.
+    """
+    bits = 0
+    for key, bit in _KEY_BITS.items():
+        if pressed[key]:
+            bits |= 1 << bit
+    return bits
+
+
+class KeyState:
+    def __init__(self, bits):
+        """
+        Stand-in for the sequence returned by pygame.key.get_pressed(),
+        backed by an input bitmask. Keys outside KEYS read as released.
+        """
+        self.bits = bits
+
+    def __getitem__(self, key):
+        bit = _KEY_BITS.get(key)
+        if bit is None:
+            return False
+        return bool(self.bits >> bit & 1)
+
+
+class KeyboardInput:
+    def get_pressed(self):
+        return pygame.key.get_pressed()
+
+
+class RecordingInput:
+    def __init__(self, source):
+        """
+        Pass key state through from `source` while remembering it as a bitmask,
+        so a replay can store exactly what the player saw.
+        """
+        self.source = source
+        self.bits = 0
+
+    def get_pressed(self):
+        self.bits = state_to_bits(self.source.get_pressed())
+        return KeyState(self.bits)
+
+    def take(self):
+        """
+        The bits read since the last take(), or 0 if the player did not read input.
+        """
+        bits = self.bits
+        self.bits = 0
+        return bits
+
+
+class ScriptedInput:
+    def __init__(self, frames, loop=False):
+        """
+        Replay a fixed sequence of per-frame input bitmasks.
+
+        Args:
+            frames: Sequence of bitmasks, one per call to get_pressed()
+            loop: Start over at the end of the script instead of releasing all keys
+        """
+        self.frames = list(frames)
+        self.loop = loop
+        self.frame = 0
+
+    @classmethod
+    def from_names(cls, frames, loop=False):
+        """
+        Build a script from per-frame lists of key names, e.g. [["w"], ["w", "space"]].
+        """
+        return cls([names_to_bits(names) for names in frames], loop=loop)
+
+    def get_pressed(self):
+        index = self.frame
+        self.frame += 1
+        if self.loop and self.frames:
+            index %= len(self.frames)
+        bits = self.frames[index] if index < len(self.frames) else 0
+        return KeyState(bits)
+
+
+class RandomInput:
+    def __init__(self, seed=0, hold_frames=15, keys=("a", "d", "w", "s", "space")):
+        """
+        Random-policy player: holds a random combination of `keys` for
+        `hold_frames` frames at a time. It draws from its own RNG, so the game's
+        `random` sequence is the same as with any other input source.
+
+        Args:
+            seed: Seed for the policy's RNG
+            hold_frames: Frames each random choice is held for
+            keys: Key names (see KEYS) the policy may press
+        """
+        self.hold_frames = hold_frames
+        self.masks = [names_to_bits([name]) for name in keys]
+        self.frame = 0
+        self.bits = 0
+        self._rng = random.Random(seed)
+
+    def get_pressed(self):
+        if self.frame % self.hold_frames == 0:
+            self.bits = 0
+            for mask in self.masks:
+                if self._rng.random() < 0.5:
+                    self.bits |= mask
+        self.frame += 1
+        return KeyState(self.bits)
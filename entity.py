@@ -0,0 +1,107 @@
+class EntityGroup:
+    # Lets pygame Sprites (player, spawners, the entity store) join as well
+    _spritegroup = True
+
+    def __init__(self):
+        """
+        The game's own sprite container, used instead of pygame.sprite.Group
+        when USE_LIGHT_ENTITIES is on. Members are kept in an insertion-ordered
+        dict. It accepts Entity objects and regular pygame Sprites, and
+        supports the Group operations the game uses: iteration, len, `in`,
+        update() and sprites().
+        """
+        self._members = {}
+
+    # pygame.sprite.Sprite calls these when it joins or leaves the group
+    def add_internal(self, sprite):
+        self._members[sprite] = None
+
+    def remove_internal(self, sprite):
+        del self._members[sprite]
+
+    def has_internal(self, sprite):
+        return sprite in self._members
+
+    def add(self, *sprites):
+        for sprite in sprites:
+            sprite.add(self)
+
+    def remove(self, *sprites):
+        for sprite in sprites:
+            sprite.remove(self)
+
+    def sprites(self):
+        return list(self._members)
+
+    def update(self, *args, **kwargs):
+        # Over a copy: sprites kill themselves and spawn others while updating
+        for sprite in list(self._members):
+            sprite.update(*args, **kwargs)
+
+    def empty(self):
+        for sprite in list(self._members):
+            sprite.remove(self)
+
+    def __iter__(self):
+        return iter(list(self._members))
+
+    def __len__(self):
+        return len(self._members)
+
+    def __bool__(self):
+        return bool(self._members)
+
+    def __contains__(self, sprite):
+        return sprite in self._members
+
+
+class Entity:
+    # The groups the entity is in, None once killed. It is normally the class's
+    # shared `containers` tuple, so membership costs one slot per entity
+    # instead of a per-sprite dict.
+    __slots__ = ("_groups",)
+
+    def __init__(self, *groups):
+        """
+        Lightweight stand-in for pygame.sprite.Sprite, with no instance
+        __dict__. It has the Sprite interface the game relies on: add, remove,
+        kill, alive, groups and update.
+        Entities can only join EntityGroups.
+        """
+        self._groups = None
+        if groups:
+            self.add(*groups)
+
+    def add(self, *groups):
+        if len(groups) == 1:
+            groups = groups[0]
+        if isinstance(groups, EntityGroup):
+            groups = (groups,)
+        for group in groups:
+            group.add_internal(self)
+        self._groups = groups if self._groups is None else self._groups + tuple(groups)
+
+    def remove(self, *groups):
+        current = self._groups or ()
+        remaining = tuple(group for group in current if group not in groups)
+        for group in current:
+            if group in groups:
+                group.remove_internal(self)
+        self._groups = remaining or None
+
+    def kill(self):
+        groups = self._groups
+        if groups is None:
+            return
+        self._groups = None
+        for group in groups:
+            group.remove_internal(self)
+
+    def alive(self):
+        return self._groups is not None
+
+    def groups(self):
+        return list(self._groups or ())
+
+    def update(self, *args, **kwargs):
+        pass
@@ -0,0 +1,444 @@
+import math
+import pygame
+from circleshape import CircleShape, reclaim_counter
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_WRAP, COLLISION_CELL_SIZE
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only the array-backed mode needs it
+    np = None
+
+
+class EntityStore(pygame.sprite.Sprite):
+    def __init__(self, capacity=256):
+        """
+        Structure-of-arrays storage for StoredShape sprites.
+
+        Position, velocity, radius, age and alive flags live in contiguous
+        NumPy arrays so movement, culling and collision tests run as one
+        vectorized step per frame instead of one method call per sprite.
+        The store is itself an updatable sprite, like AsteroidField.
+
+        Args:
+            capacity: Initial number of slots; the arrays double when full
+        """
+        if np is None:
+            raise ImportError("EntityStore requires numpy (pip install numpy)")
+        if hasattr(self, "containers"):
+            pygame.sprite.Sprite.__init__(self, self.containers)
+        else:
+            pygame.sprite.Sprite.__init__(self)
+
+        self.positions = np.zeros((capacity, 2))
+        self.velocities = np.zeros((capacity, 2))
+        self.radii = np.zeros(capacity)
+        self.ages = np.zeros(capacity)
+        self.max_ages = np.full(capacity, np.inf)
+        self.margins = np.zeros(capacity)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.owners = [None] * capacity
+        self.size = 0  # high-water mark of used slots
+        self._free = []
+
+    def _grow(self):
+        capacity = len(self.owners) * 2
+        for name in ("positions", "velocities", "radii", "ages", "max_ages", "margins", "live"):
+            old = getattr(self, name)
+            shape = (capacity,) + old.shape[1:]
+            fill = np.inf if name == "max_ages" else 0
+            new = np.full(shape, fill, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        self.owners.extend([None] * (capacity - len(self.owners)))
+
+    def allocate(self, owner, position, velocity, radius):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self.size == len(self.owners):
+                self._grow()
+            slot = self.size
+            self.size += 1
+
+        # Tuples: numpy converts a pygame.Vector2 row several times slower
+        self.positions[slot] = position.x, position.y
+        self.velocities[slot] = velocity.x, velocity.y
+        self.radii[slot] = radius
+        self.ages[slot] = 0.0
+        max_lifetime = owner.max_lifetime
+        self.max_ages[slot] = math.inf if max_lifetime is None else max_lifetime
+        self.margins[slot] = owner.offscreen_margin
+        self.live[slot] = True
+        self.owners[slot] = owner
+        return slot
+
+    def release(self, slot):
+        # Dead slots keep zero velocity so integration can run over all of them
+        self.velocities[slot] = 0
+        self.live[slot] = False
+        self.owners[slot] = None
+        self._free.append(slot)
+
+    def update(self, dt):
+        n = self.size
+        if n == 0:
+            return
+
+        positions = self.positions[:n]
+        positions += self.velocities[:n] * dt
+        self.ages[:n] += dt
+
+        if SCREEN_WRAP:
+            positions %= (SCREEN_WIDTH, SCREEN_HEIGHT)
+            expired = self.ages[:n] > self.max_ages[:n]
+        else:
+            reach = self.margins[:n] + self.radii[:n]
+            expired = (
+                (positions[:, 0] < -reach)
+                | (positions[:, 0] > SCREEN_WIDTH + reach)
+                | (positions[:, 1] < -reach)
+                | (positions[:, 1] > SCREEN_HEIGHT + reach)
+                | (self.ages[:n] > self.max_ages[:n])
+            )
+        expired &= self.live[:n]
+        for slot in np.flatnonzero(expired).tolist():
+            self.owners[slot].kill()
+            reclaim_counter.record()
+
+    def overlapping(self, slots, position, radius):
+        """
+        Vectorized circle test of many stored sprites against one circle.
+
+        Returns:
+            list: Indices into `slots` that overlap, in ascending order
+        """
+        delta = _wrapped(self.positions[slots] - (position.x, position.y))
+        reach = self.radii[slots] + radius
+        hits = (delta * delta).sum(axis=1) <= reach * reach
+        return np.flatnonzero(hits).tolist()
+
+    def collision_pairs(self, slots_a, slots_b):
+        """
+        Vectorized circle test between two slot arrays, run only on the
+        candidate pairs of a uniform-grid broad phase (see _grid_candidates()).
+
+        Returns:
+            list: (i, j) index pairs into `slots_a` and `slots_b`, ordered
+            as a nested loop over a then b would find them
+        """
+        if len(slots_a) == 0 or len(slots_b) == 0:
+            return []
+
+        position_a = self.positions[slots_a]
+        position_b = self.positions[slots_b]
+        radius_a = self.radii[slots_a]
+        radius_b = self.radii[slots_b]
+        i, j = _grid_candidates(position_a, radius_a, position_b, radius_b)
+        delta = _wrapped(position_a[i] - position_b[j])
+        reach = radius_a[i] + radius_b[j]
+        hits = (delta * delta).sum(axis=1) <= reach * reach
+        return list(zip(i[hits].tolist(), j[hits].tolist()))
+
+    def render_positions(self, slots, lag=0.0):
+        """
+        Where to draw many stored sprites at once, see CircleShape.render_position().
+
+        Returns:
+            list: [x, y] per slot
+        """
+        positions = self.positions[slots]
+        if lag:
+            positions = positions - self.velocities[slots] * lag
+        return positions.tolist()
+
+    def sweeps(self, slots, dt):
+        """
+        Seconds each sprite has been moving for this frame: dt, or its age if
+        it was spawned more recently.
+        """
+        return np.minimum(self.ages[slots], dt)
+
+    def swept_overlapping(self, slots, position, velocity, radius, dt):
+        """
+        Vectorized swept test of many moving stored circles against one
+        circle, over each one's sweep (see sweeps()). Motion is taken relative
+        to the single circle, so both may move.
+
+        Returns:
+            list: Indices into `slots` that touched the circle during the sweep, in ascending order
+        """
+        offset = _wrapped(self.positions[slots] - (position.x, position.y))
+        motion = (self.velocities[slots] - (velocity.x, velocity.y)) * self.sweeps(slots, dt)[:, None]
+        reach = self.radii[slots] + radius
+        hits = _closest_approach_squared(offset, motion) <= reach * reach
+        return np.flatnonzero(hits).tolist()
+
+    def swept_collision_pairs(self, slots_a, slots_b, dt):
+        """
+        Vectorized swept test: every `b` is swept back over its sweep (see
+        sweeps()) relative to every `a`, for the pairs whose paths share a
+        grid cell (see _grid_candidates()).
+
+        Returns:
+            list: (i, j) index pairs into `slots_a` and `slots_b`, ordered
+            as a nested loop over a then b would find them
+        """
+        if len(slots_a) == 0 or len(slots_b) == 0:
+            return []
+
+        position_a = self.positions[slots_a]
+        position_b = self.positions[slots_b]
+        velocity_a = self.velocities[slots_a]
+        velocity_b = self.velocities[slots_b]
+        radius_a = self.radii[slots_a]
+        radius_b = self.radii[slots_b]
+        sweep_b = self.sweeps(slots_b, dt)[:, None]
+        # Bucketed by the circle around each path: an a's over dt, a b's over its sweep
+        half_a = velocity_a * (dt / 2)
+        half_b = velocity_b * (sweep_b / 2)
+        i, j = _grid_candidates(
+            position_a - half_a,
+            radius_a + np.sqrt((half_a * half_a).sum(axis=1)),
+            position_b - half_b,
+            radius_b + np.sqrt((half_b * half_b).sum(axis=1)),
+        )
+        offset = _wrapped(position_b[j] - position_a[i])
+        motion = (velocity_b[j] - velocity_a[i]) * sweep_b[j]
+        reach = radius_a[i] + radius_b[j]
+        hits = _closest_approach_squared(offset, motion) <= reach * reach
+        return list(zip(i[hits].tolist(), j[hits].tolist()))
+
+
+def _grid_cells(centers, reach):
+    # Every cell each box overlaps as (box index, cell key) arrays, on the
+    # same grid as collision.SpatialGrid
+    if SCREEN_WRAP:
+        columns = max(1, round(SCREEN_WIDTH / COLLISION_CELL_SIZE))
+        rows = max(1, round(SCREEN_HEIGHT / COLLISION_CELL_SIZE))
+        size = np.array((SCREEN_WIDTH / columns, SCREEN_HEIGHT / rows))
+    else:
+        size = COLLISION_CELL_SIZE
+    low = ((centers - reach[:, None]) // size).astype(np.int64)
+    span = ((centers + reach[:, None]) // size).astype(np.int64) - low + 1
+    if SCREEN_WRAP:
+        # A box wider than the screen covers every column once, not twice
+        span = np.minimum(span, (columns, rows))
+    counts = span[:, 0] * span[:, 1]
+    box = np.repeat(np.arange(len(centers)), counts)
+    nth = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    height = span[box, 1]
+    cell_x = low[box, 0] + nth // height
+    cell_y = low[box, 1] + nth % height
+    if SCREEN_WRAP:
+        cell_x %= columns
+        cell_y %= rows
+    return box, (cell_x << 32) + cell_y
+
+
+def _grid_candidates(centers_a, reach_a, centers_b, reach_b):
+    """
+    Vectorized uniform-grid broad phase: the (a, b) box pairs that share at
+    least one grid cell.
+
+    Returns:
+        tuple: (i, j) index arrays into a and b, without duplicates and
+        sorted by i, then j
+    """
+    box_b, keys_b = _grid_cells(centers_b, reach_b)
+    order = np.argsort(keys_b, kind="stable")
+    box_b = box_b[order]
+    keys_b = keys_b[order]
+    box_a, keys_a = _grid_cells(centers_a, reach_a)
+    starts = np.searchsorted(keys_b, keys_a, side="left")
+    counts = np.searchsorted(keys_b, keys_a, side="right") - starts
+    nth = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    i = np.repeat(box_a, counts)
+    j = box_b[np.repeat(starts, counts) + nth]
+    # Boxes sharing several cells meet once per shared cell
+    pairs = np.unique(i * len(centers_b) + j)
+    return pairs // len(centers_b), pairs % len(centers_b)
+
+
+def _wrapped(delta):
+    # Position differences on the wrapped screen, see world.wrap_offset()
+    if not SCREEN_WRAP:
+        return delta
+    size = np.array((SCREEN_WIDTH, SCREEN_HEIGHT), dtype=float)
+    return delta - size * np.round(delta / size)
+
+
+def _closest_approach_squared(offset, motion):
+    # Squared distance from the origin to the segment offset - motion * s, s in [0, 1]
+    length_squared = (motion * motion).sum(axis=-1)
+    along = (offset * motion).sum(axis=-1) / np.where(length_squared > 0, length_squared, 1.0)
+    s = np.clip(along, 0.0, 1.0)[..., None]
+    closest = offset - motion * s
+    return (closest * closest).sum(axis=-1)
+
+
+def stored_slots(sprites):
+    """
+    Store and slot array backing a list of sprites.
+
+    Returns:
+        tuple: (store, slots), or (None, None) if any sprite is not held by
+        the same EntityStore
+    """
+    store = None
+    slots = []
+    for sprite in sprites:
+        slot = getattr(sprite, "_slot", None)
+        if slot is None or (store is not None and sprite.store is not store):
+            return None, None
+        store = sprite.store
+        slots.append(slot)
+    if store is None:
+        return None, None
+    return store, np.array(slots, dtype=np.intp)
+
+
+class SlotVector(pygame.Vector2):
+    """
+    Vector read from a StoredShape's store slot. Changing it in place
+    (`shape.position.x += 1`, `shape.velocity.rotate_ip(30)`) writes the new
+    value back to the shape, as it would on a plain sprite. Vectors computed
+    from it are detached: they have no owner and never write back.
+    """
+    __slots__ = ("_owner", "_attribute")
+
+    def _write_back(self):
+        owner = getattr(self, "_owner", None)
+        if owner is not None:
+            setattr(owner, self._attribute, self)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._write_back()
+
+
+def _writing_back(method):
+    def mutate(self, *args):
+        result = method(self, *args)
+        self._write_back()
+        return result
+    mutate.__name__ = method.__name__
+    return mutate
+
+
+for _name in dir(pygame.Vector2):
+    if _name.endswith("_ip") or _name in (
+        "update",
+        "__setitem__",
+        "__iadd__",
+        "__isub__",
+        "__imul__",
+        "__itruediv__",
+        "__ifloordiv__",
+    ):
+        setattr(SlotVector, _name, _writing_back(getattr(pygame.Vector2, _name)))
+
+
+_set_vector_attribute = pygame.Vector2.__setattr__
+
+
+def _slot_vector(owner, attribute, array, slot):
+    vector = SlotVector(array.item(slot, 0), array.item(slot, 1))
+    # Straight to the slots, past SlotVector.__setattr__
+    _set_vector_attribute(vector, "_owner", owner)
+    _set_vector_attribute(vector, "_attribute", attribute)
+    return vector
+
+
+class StoredShape(CircleShape):
+    # Fallback state for instances without a store slot
+    __slots__ = ("_slot", "_position", "_velocity", "_radius", "_age")
+
+    # Set to an EntityStore to back every subclass instance with its arrays
+    store = None
+
+    def __init__(self, x, y, radius):
+        self._slot = None
+        super().__init__(x, y, radius)
+        if self.store is not None:
+            self._slot = self.store.allocate(self, self._position, self._velocity, self._radius)
+
+    def reset(self, x, y, radius):
+        # Killed sprites have no slot, so this resets the fallback attributes
+        super().reset(x, y, radius)
+        if self.store is not None:
+            self._slot = self.store.allocate(self, self._position, self._velocity, self._radius)
+
+    # Views over the store; vectors come back as SlotVectors that write through
+    @property
+    def position(self):
+        if self._slot is None:
+            return self._position
+        return _slot_vector(self, "position", self.store.positions, self._slot)
+
+    @position.setter
+    def position(self, value):
+        if self._slot is None:
+            self._position = value
+        else:
+            x, y = value
+            self.store.positions[self._slot] = x, y
+
+    @property
+    def velocity(self):
+        if self._slot is None:
+            return self._velocity
+        return _slot_vector(self, "velocity", self.store.velocities, self._slot)
+
+    @velocity.setter
+    def velocity(self, value):
+        if self._slot is None:
+            self._velocity = value
+        else:
+            x, y = value
+            self.store.velocities[self._slot] = x, y
+
+    @property
+    def radius(self):
+        if self._slot is None:
+            return self._radius
+        return self.store.radii.item(self._slot)
+
+    @radius.setter
+    def radius(self, value):
+        if self._slot is None:
+            self._radius = value
+        else:
+            self.store.radii[self._slot] = value
+
+    @property
+    def age(self):
+        if self._slot is None:
+            return self._age
+        return self.store.ages.item(self._slot)
+
+    @age.setter
+    def age(self, value):
+        if self._slot is None:
+            self._age = value
+        else:
+            self.store.ages[self._slot] = value
+
+    def update(self, dt):
+        # Stored instances are moved and culled by EntityStore.update
+        if self._slot is None:
+            self.position += self.velocity * dt
+            self.expire(dt)
+
+    def kill(self):
+        slot = self._slot
+        if slot is not None:
+            # Keep the final state readable after death (split_asteroids needs it)
+            store = self.store
+            self._position = pygame.Vector2(store.positions.item(slot, 0), store.positions.item(slot, 1))
+            self._velocity = pygame.Vector2(store.velocities.item(slot, 0), store.velocities.item(slot, 1))
+            self._radius = store.radii.item(slot)
+            self._age = store.ages.item(slot)
+            self._slot = None
+            store.release(slot)
+        super().kill()
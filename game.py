@@ -0,0 +1,314 @@
+import math
+import pygame
+from constants import (
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+    ASTEROID_MIN_RADIUS,
+    ASTEROID_SCORES,
+    UFO_SCORE,
+    PLAYER_LIVES,
+    USE_ENTITY_STORE,
+    USE_LIGHT_ENTITIES,
+    SWEPT_COLLISIONS,
+)
+from logger import log_event, register_group, register_sprite
+from player import Player
+from asteroid import Asteroid, split_asteroids
+from asteroidfield import AsteroidField
+from shot import Shot
+from ufo import UFO, UFOShot, UFOField
+from collision import (
+    CollisionDispatcher,
+    collision_pairs,
+    collisions_with,
+    swept_collision_pairs,
+    swept_collisions_with,
+)
+from circleshape import reclaim_counter
+from pool import recycle_pools, pool_stats
+from entitystore import EntityStore, StoredShape
+from entity import EntityGroup
+
+
+def score_for_radius(radius):
+    # ASTEROID_SCORES runs from the smallest kind up; bigger asteroids score like the last entry
+    kind = max(1, math.ceil(radius / ASTEROID_MIN_RADIUS))
+    return ASTEROID_SCORES[min(kind, len(ASTEROID_SCORES)) - 1]
+
+def init_game():
+    """
+    Initialize game state including sprite groups, containers, player, and asteroid field.
+
+    Returns:
+        tuple: (updatable, drawable, asteroids, shots, ufos, ufo_shots, player) sprite groups and player instance
+    """
+    # Sprite groups; light entities can only live in the game's own containers
+    Group = EntityGroup if USE_LIGHT_ENTITIES else pygame.sprite.Group
+    updatable = Group()
+    drawable = Group()
+    asteroids = Group()
+    shots = Group()
+    ufos = Group()
+    ufo_shots = Group()
+
+    Player.containers = (updatable, drawable)
+    if USE_ENTITY_STORE:
+        # Asteroids and shots are moved in bulk by the store, not one update() each
+        EntityStore.containers = (updatable)
+        StoredShape.store = EntityStore()
+        Asteroid.containers = (asteroids, drawable)
+        Shot.containers = (shots, drawable)
+    else:
+        StoredShape.store = None
+        Asteroid.containers = (asteroids, updatable, drawable)
+        Shot.containers = (shots, updatable, drawable)
+    AsteroidField.containers = (updatable)
+    AsteroidField.asteroids = asteroids
+    UFO.containers = (ufos, updatable, drawable)
+    UFOShot.containers = (ufo_shots, updatable, drawable)
+    UFOField.containers = (updatable)
+
+    # create player
+    player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+    # create asteroid field
+    AsteroidField()
+    # create ufo field
+    UFOField.player = player
+    UFOField()
+
+    # State snapshots read these directly
+    register_group("updatable", updatable)
+    register_group("drawable", drawable)
+    register_group("asteroids", asteroids)
+    register_group("shots", shots)
+    register_group("ufos", ufos)
+    register_group("ufo_shots", ufo_shots)
+    register_sprite("player", player)
+
+    return updatable, drawable, asteroids, shots, ufos, ufo_shots, player
+
+
+class Game:
+    # Collision passes in the order step() runs them; each only queues hits
+    COLLISION_PASSES = (
+        "collide_player_asteroids",
+        "collide_asteroids_shots",
+        "collide_player_ufos",
+        "collide_player_ufo_shots",
+        "collide_ufos_shots",
+    )
+
+    def __init__(self):
+        """
+        Game logic for one play-through without any rendering: sprite groups,
+        score, lives and the per-frame update and collision passes. The
+        windowed loop in main.py and headless runs both drive it through step().
+        """
+        self.score = 0
+        self.lives = PLAYER_LIVES
+        self.game_over = False
+        # Length of the frame being stepped; shots are swept back over it
+        self.dt = 0.0
+        self.collisions = CollisionDispatcher()
+        self.collisions.register(Player, Asteroid, self.player_hit_asteroid)
+        self.collisions.register(Asteroid, Shot, self.asteroid_hit_shot)
+        self.collisions.register(Player, UFO, self.player_hit_ufo)
+        self.collisions.register(Player, UFOShot, self.player_hit_ufo_shot)
+        self.collisions.register(UFO, Shot, self.ufo_hit_shot)
+        self.reset_world()
+
+    def reset_world(self):
+        """
+        Swap in a fresh world: new sprite groups with a new player and
+        spawners. The old groups and everything in them are dropped as a
+        whole instead of being killed sprite by sprite, and hits queued
+        against them are discarded.
+        """
+        (
+            self.updatable,
+            self.drawable,
+            self.asteroids,
+            self.shots,
+            self.ufos,
+            self.ufo_shots,
+            self.player,
+        ) = init_game()
+        self.collisions.clear()
+        # Asteroids shot this frame, split together once all hits are resolved
+        self.shot_asteroids = []
+
+    def step(self, dt, mark=None):
+        """
+        Advance the game by one frame of `dt` seconds.
+
+        Args:
+            dt: Frame time in seconds
+            mark: Optional callable, called with each phase's name ("update",
+                every COLLISION_PASSES entry, then "resolve_hits") as soon as
+                it finishes
+        """
+        self.update(dt)
+        if mark is None:
+            for name in self.COLLISION_PASSES:
+                getattr(self, name)()
+            self.resolve_hits()
+            return
+        mark("update")
+        for name in self.COLLISION_PASSES:
+            getattr(self, name)()
+            mark(name)
+        self.resolve_hits()
+        mark("resolve_hits")
+
+    def update(self, dt):
+        self.dt = dt
+        # Sprites killed last frame can be spawned again from here on
+        recycle_pools()
+        # Update sprites in updatable group
+        self.updatable.update(dt)
+        if reclaim_counter.tick(dt):
+            if reclaim_counter.per_second > 0:
+                log_event(
+                    "entities_reclaimed",
+                    per_second=round(reclaim_counter.per_second, 2),
+                    total=reclaim_counter.total,
+                )
+            stats = pool_stats()
+            if stats:
+                log_event("sprite_pools", **stats)
+
+    def collide_player_asteroids(self):
+        player = self.player
+        self.collisions.queue_pairs((player, asteroid) for asteroid in collisions_with(player, self.asteroids))
+
+    def collide_asteroids_shots(self):
+        if SWEPT_COLLISIONS:
+            self.collisions.queue_pairs(swept_collision_pairs(self.asteroids, self.shots, self.dt))
+        else:
+            self.collisions.queue_pairs(collision_pairs(self.asteroids, self.shots))
+
+    def collide_player_ufos(self):
+        player = self.player
+        self.collisions.queue_pairs((player, ufo) for ufo in collisions_with(player, self.ufos))
+
+    def collide_player_ufo_shots(self):
+        player = self.player
+        if SWEPT_COLLISIONS:
+            hits = swept_collisions_with(player, self.ufo_shots, self.dt)
+        else:
+            hits = collisions_with(player, self.ufo_shots)
+        self.collisions.queue_pairs((player, ufo_shot) for ufo_shot in hits)
+
+    def collide_ufos_shots(self):
+        if SWEPT_COLLISIONS:
+            self.collisions.queue_pairs(swept_collision_pairs(self.ufos, self.shots, self.dt))
+        else:
+            self.collisions.queue_pairs(collision_pairs(self.ufos, self.shots))
+
+    def resolve_hits(self):
+        """
+        Run the responses to this frame's queued hits, then split every
+        asteroid they destroyed in one batch.
+
+        Returns:
+            int: Number of hits resolved
+        """
+        resolved = self.collisions.resolve()
+        if self.shot_asteroids:
+            split_asteroids(self.shot_asteroids)
+            self.shot_asteroids = []
+        return resolved
+
+    def player_hit_asteroid(self, player, asteroid):
+        if self.game_over:
+            return
+        distance = player.position.distance_to(asteroid.position)
+        nearest = None
+        for other in self.asteroids:
+            if not other.alive():
+                continue
+            d = player.position.distance_to(other.position)
+            if nearest is None or d < nearest[0]:
+                nearest = (d, other)
+        log_event(
+            "player_hit",
+            player_pos=[round(player.position.x, 2), round(player.position.y, 2)],
+            player_radius=player.radius,
+            asteroid_pos=[round(asteroid.position.x, 2), round(asteroid.position.y, 2)],
+            asteroid_radius=asteroid.radius,
+            distance=round(distance, 2),
+            collides=distance <= player.radius + asteroid.radius,
+            asteroid_alive=asteroid.alive(),
+            nearest_asteroid_pos=[
+                round(nearest[1].position.x, 2),
+                round(nearest[1].position.y, 2),
+            ]
+            if nearest
+            else None,
+            nearest_asteroid_radius=nearest[1].radius if nearest else None,
+            nearest_asteroid_distance=round(nearest[0], 2) if nearest else None,
+        )
+        self.lose_life(f"Player hit asteroid with radius {asteroid.radius}")
+
+    def asteroid_hit_shot(self, asteroid, shot):
+        if self.game_over:
+            return
+        log_event("asteroid_shot")
+        self.score += score_for_radius(asteroid.radius)
+        log_event(f"asteroid_shot_score_{score_for_radius(asteroid.radius)}")
+        shot.kill()
+        # Killed now so later hits this frame skip it; the split comes after all of them
+        asteroid.kill()
+        self.shot_asteroids.append(asteroid)
+
+    def player_hit_ufo(self, player, ufo):
+        if self.game_over:
+            return
+        distance = player.position.distance_to(ufo.position)
+        log_event(
+            "player_hit_ufo",
+            player_pos=[round(player.position.x, 2), round(player.position.y, 2)],
+            player_radius=player.radius,
+            ufo_pos=[round(ufo.position.x, 2), round(ufo.position.y, 2)],
+            ufo_radius=ufo.radius,
+            distance=round(distance, 2),
+            collides=distance <= player.radius + ufo.radius,
+            ufo_alive=ufo.alive(),
+        )
+        self.lose_life("Player hit ufo")
+
+    def player_hit_ufo_shot(self, player, ufo_shot):
+        if self.game_over:
+            return
+        distance = player.position.distance_to(ufo_shot.position)
+        log_event(
+            "player_hit_ufo_shot",
+            player_pos=[round(player.position.x, 2), round(player.position.y, 2)],
+            player_radius=player.radius,
+            ufo_shot_pos=[round(ufo_shot.position.x, 2), round(ufo_shot.position.y, 2)],
+            ufo_shot_radius=ufo_shot.radius,
+            distance=round(distance, 2),
+            collides=distance <= player.radius + ufo_shot.radius,
+            ufo_shot_alive=ufo_shot.alive(),
+        )
+        self.lose_life("Player hit ufo shot")
+
+    def ufo_hit_shot(self, ufo, shot):
+        if self.game_over:
+            return
+        log_event("ufo_destroyed")
+        self.score += UFO_SCORE
+        shot.kill()
+        ufo.kill()
+
+    def lose_life(self, cause):
+        self.lives -= 1
+        if self.lives <= 0:
+            print("Game over!")
+            print(cause)
+            print(f"Final Score: {self.score}")
+            self.game_over = True
+        else:
+            print("Player respawned")
+            print(f"lives remaining: {self.lives}")
+            self.reset_world()
@@ -0,0 +1,90 @@
+import argparse
+import itertools
+import json
+import random
+import time
+from constants import HEADLESS_DT
+from controls import ScriptedInput
+from game import Game
+from player import Player
+
+
+def run_headless(frames, dt=HEADLESS_DT, seed=0, inputs=None, dts=None):
+    """
+    Run the game logic without a display at a fixed timestep, as fast as the CPU allows.
+
+    Args:
+        frames: Maximum number of frames to simulate
+        dt: Fixed frame time in seconds
+        seed: Seed for the `random` module used by spawning, splitting and UFOs
+        inputs: Object with get_pressed() (e.g. ScriptedInput); defaults to no keys held
+        dts: Per-frame times (e.g. from a replay); when given they replace `dt`
+            and `frames` is capped at their number
+
+    Returns:
+        dict: Summary with frames run, simulated seconds, score, lives, peak
+        entity counts and simulated fps
+    """
+    random.seed(seed)
+    keyboard = Player.input_source
+    Player.input_source = inputs if inputs is not None else ScriptedInput([])
+    try:
+        game = Game()
+        if dts is None:
+            dts = itertools.repeat(dt, frames)
+        # Looked up by name every frame: a respawn swaps in new groups
+        peaks = dict.fromkeys(("asteroids", "shots", "ufos", "ufo_shots"), 0)
+        frame = 0
+        simulated = 0.0
+        start = time.perf_counter()
+        for frame_dt in itertools.islice(dts, frames):
+            if game.game_over:
+                break
+            game.step(frame_dt)
+            simulated += frame_dt
+            frame += 1
+            for name in peaks:
+                count = len(getattr(game, name))
+                if count > peaks[name]:
+                    peaks[name] = count
+        elapsed = time.perf_counter() - start
+    finally:
+        Player.input_source = keyboard
+
+    return {
+        "seed": seed,
+        "dt": dt,
+        "frames": frame,
+        "simulated_s": round(simulated, 3),
+        "score": game.score,
+        "lives": game.lives,
+        "game_over": game.game_over,
+        "peak_entities": peaks,
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(frame / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Asteroids without a display.")
+    parser.add_argument("--frames", type=int, default=3600, help="maximum frames to simulate")
+    parser.add_argument("--dt", type=float, default=HEADLESS_DT, help="fixed frame time in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--script",
+        help='JSON file with per-frame lists of held keys, e.g. [["w"], ["w", "space"]]',
+    )
+    parser.add_argument("--loop", action="store_true", help="repeat the input script")
+    args = parser.parse_args()
+
+    inputs = None
+    if args.script:
+        with open(args.script, "r") as f:
+            inputs = ScriptedInput.from_names(json.load(f), loop=args.loop)
+
+    result = run_headless(args.frames, dt=args.dt, seed=args.seed, inputs=inputs)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import heapq
+import json
+import os
+from collections import Counter
+
+LEADERBOARD_FILE = "leaderboard.jsonl"
+# Number of best entries kept in memory (and in the file after compaction)
+LEADERBOARD_SIZE = 100
+# Compact once the file holds this many more records than are retained
+_COMPACT_SLACK = 32
+
+
+class Leaderboard:
+    def __init__(self, path=LEADERBOARD_FILE, size=LEADERBOARD_SIZE):
+        """
+        Score table stored as an append-only JSONL file, one record per score:
+        {"name": ..., "score": ..., "timestamp": ...}.
+
+        Memory stays bounded no matter how many games were played: only the
+        `size` best entries are kept (in a min-heap, O(log n) inserts), plus
+        a count per distinct score for exact ranks and each player's best.
+        Compaction rewrites the file as those records and one
+        {"score_counts": {...}} line for every score that was dropped.
+
+        Older snapshot lines ({"updated_at": ..., "entries": [...]}) are still
+        read, each one replacing everything before it, and such a file is
+        compacted the first time it is loaded.
+
+        Args:
+            path: Leaderboard file, relative to the working directory
+            size: Number of best entries to keep
+        """
+        self.path = path
+        self.size = size
+        self.total = 0
+        # (score, -sequence, entry): the root is the lowest, newest entry
+        self._heap = []
+        self._heap_ids = set()
+        self._sequence = 0
+        self._counts = Counter()
+        self._best = {}
+        # Distinct entries in the heap or a player's best, kept up to date by _insert
+        self._retained = 0
+        self._ranked = None
+        self._records = 0
+        self._load()
+
+    def _reset(self):
+        self.total = 0
+        self._heap = []
+        self._heap_ids = set()
+        self._counts = Counter()
+        self._best = {}
+        self._retained = 0
+        self._ranked = None
+
+    def _load(self):
+        try:
+            f = open(self.path, "r")
+        except FileNotFoundError:
+            return
+
+        legacy = False
+        with f:
+            # Stream the file so memory never holds more than the retained entries
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    payload = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(payload, dict):
+                    continue
+                if isinstance(payload.get("entries"), list):
+                    # Snapshot-style line: the full table as of that moment
+                    legacy = True
+                    self._reset()
+                    for entry in payload["entries"]:
+                        if isinstance(entry, dict):
+                            self._insert(entry)
+                elif isinstance(payload.get("score_counts"), dict):
+                    for score, count in payload["score_counts"].items():
+                        self._counts[int(score)] += count
+                        self.total += count
+                elif "score" in payload:
+                    self._insert(payload)
+                    self._records += 1
+
+        if legacy or self._records > self._retained + _COMPACT_SLACK:
+            self.compact()
+
+    def _insert(self, entry):
+        score = int(entry.get("score", 0))
+        self._counts[score] += 1
+        self.total += 1
+
+        name = entry.get("name")
+        best = self._best.get(name)
+        is_best = best is None or score > int(best.get("score", 0))
+        if is_best:
+            self._best[name] = entry
+            # The replaced best stays retained only while the heap holds it
+            if best is not None and id(best) not in self._heap_ids:
+                self._retained -= 1
+
+        item = (score, -self._sequence, entry)
+        self._sequence += 1
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            evicted = heapq.heapreplace(self._heap, item)[2]
+            self._heap_ids.discard(id(evicted))
+            if self._best.get(evicted.get("name")) is not evicted:
+                self._retained -= 1
+        else:
+            if is_best:
+                self._retained += 1
+            return
+        self._heap_ids.add(id(entry))
+        self._retained += 1
+        self._ranked = None
+
+    def add(self, entry):
+        """
+        Record one score: insert it into the index and append it to the file.
+        """
+        self._insert(entry)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._records += 1
+        if self._records > self._retained + _COMPACT_SLACK:
+            self.compact()
+
+    def top(self, k):
+        """
+        The `k` highest entries, best first (at most `size`).
+        """
+        if self._ranked is None:
+            self._ranked = [entry for _, _, entry in sorted(self._heap, reverse=True)]
+        return self._ranked[:k]
+
+    def rank_of(self, score):
+        """
+        1-based rank `score` has (or would have) among every recorded score;
+        equal scores share a rank.
+        """
+        return 1 + sum(count for recorded, count in self._counts.items() if recorded > score)
+
+    def best_for(self, name):
+        """
+        The best entry recorded under `name`, or None.
+        """
+        return self._best.get(name)
+
+    def __len__(self):
+        return self.total
+
+    def compact(self):
+        """
+        Rewrite the file as the retained entries plus each player's best, with
+        every other score folded into a single score_counts line.
+        """
+        records = {id(entry): entry for entry in self.top(self.size)}
+        for entry in self._best.values():
+            records.setdefault(id(entry), entry)
+
+        dropped = Counter(self._counts)
+        for entry in records.values():
+            dropped[int(entry.get("score", 0))] -= 1
+        dropped = {str(score): count for score, count in dropped.items() if count > 0}
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            if dropped:
+                f.write(json.dumps({"score_counts": dropped}) + "\n")
+            for entry in records.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(temp_path, self.path)
+        self._records = self._retained = len(records)
+
+
+_leaderboards = {}
+
+
+def get_leaderboard(path=LEADERBOARD_FILE):
+    """
+    Process-wide Leaderboard for `path`, loaded from disk on first use only.
+    """
+    key = os.path.abspath(path)
+    leaderboard = _leaderboards.get(key)
+    if leaderboard is None:
+        leaderboard = _leaderboards[key] = Leaderboard(key)
+    return leaderboard
@@ -1,23 +1,297 @@
-import inspect
+import atexit
 import json
 import math
+import os
+import threading
+from collections import deque
 from datetime import datetime
-
-__all__ = ["log_state", "log_event", "log_leaderboard_score"]
+from leaderboard import get_leaderboard
+
+__all__ = [
+    "log_state",
+    "log_event",
+    "log_leaderboard_score",
+    "start_background_writer",
+    "shutdown_logging",
+    "dropped_records",
+    "register_group",
+    "register_sprite",
+    "set_screen_size",
+]
 
 _FPS = 60
 _MAX_SECONDS = 16
 _SPRITE_SAMPLE_LIMIT = 10  # Maximum number of sprites to log per group
+_FLUSH_RECORDS = 256  # Flush a log once this many records are buffered
+_FLUSH_SECONDS = 1.0  # ...or once the oldest buffered record is this old
 
 _frame_count = 0
-_state_log_initialized = False
-_event_log_initialized = False
+_screen_size = []
+_groups = {}  # name -> sprite group registered for state snapshots
+_sprites = {}  # name -> single sprite registered for state snapshots
+_layouts = {}  # sprite class -> (type name, snapshot fields)
 _start_time = datetime.now()
-_LEADERBOARD_FILE = "leaderboard.jsonl"
+
+
+class _BufferedSink:
+    def __init__(self, path):
+        """
+        JSONL writer that keeps one file handle open and writes records in batches.
+
+        A batch is written once it holds `_FLUSH_RECORDS` records, or by a
+        timer `_FLUSH_SECONDS` after its first record, so a lone record is
+        written even if nothing is logged after it (e.g. while the game over
+        screen is up).
+
+        The file is truncated on the first write of a run, like the old
+        open-per-record logging did.
+        """
+        self.path = path
+        self._file = None
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def write(self, record):
+        line = json.dumps(record)
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= _FLUSH_RECORDS:
+                self._flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(_FLUSH_SECONDS, self._flush_due)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_due(self):
+        with self._lock:
+            self._timer = None
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        if self._file is None:
+            # New log file on each run
+            self._file = open(self.path, "w")
+        self._file.write("\n".join(self._buffer) + "\n")
+        self._file.flush()
+        self._buffer.clear()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_QUEUE_POLICIES = ("block", "drop_oldest", "sample")
+
+
+class _BackgroundWriter:
+    def __init__(self, max_records, policy, sample_every):
+        """
+        Bounded queue of (sink, record) pairs drained by a dedicated thread,
+        so JSON encoding and disk writes stay off the game loop.
+
+        Args:
+            max_records: Queue capacity
+            policy: What to do with a new record when the queue is full:
+                "block" waits for space, "drop_oldest" evicts the oldest queued
+                record, "sample" keeps one record in `sample_every` once the
+                queue is half full and drops the rest (all of them when full)
+            sample_every: Sampling interval for the "sample" policy
+        """
+        if policy not in _QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy {policy!r}, expected one of {_QUEUE_POLICIES}")
+        self.max_records = max_records
+        self.policy = policy
+        self.sample_every = max(1, sample_every)
+        self.dropped = 0
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._sampled = 0
+        self._sinks = set()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, sink, record):
+        with self._condition:
+            if self._closed:
+                sink.write(record)
+                return
+            if self.policy == "block":
+                while len(self._queue) >= self.max_records and not self._closed:
+                    self._condition.wait()
+            elif self.policy == "drop_oldest":
+                if len(self._queue) >= self.max_records:
+                    self._queue.popleft()
+                    self.dropped += 1
+            elif len(self._queue) >= self.max_records // 2:
+                self._sampled += 1
+                if len(self._queue) >= self.max_records or self._sampled % self.sample_every:
+                    self.dropped += 1
+                    return
+            self._queue.append((sink, record))
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._queue and not self._closed:
+                    self._condition.wait(timeout=_FLUSH_SECONDS)
+                batch = list(self._queue)
+                self._queue.clear()
+                closed = self._closed
+                self._condition.notify_all()
+
+            for sink, record in batch:
+                self._sinks.add(sink)
+                sink.write(record)
+            if not batch:
+                # Idle: push out whatever the sinks are still holding
+                for sink in self._sinks:
+                    sink.flush()
+            if closed and not batch:
+                return
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+
+_state_sink = _BufferedSink("game_state.jsonl")
+_event_sink = _BufferedSink("game_events.jsonl")
+_writer = None
+
+
+def _emit(sink, record):
+    if sink._file is None:
+        # Resolve against the working directory at the time of the first record
+        sink.path = os.path.abspath(sink.path)
+    if _writer is not None:
+        _writer.put(sink, record)
+    else:
+        sink.write(record)
+
+
+def start_background_writer(max_records=4096, policy="drop_oldest", sample_every=4):
+    """
+    Move log encoding and writing onto a background thread fed by a bounded queue.
+
+    Args:
+        max_records: Queue capacity
+        policy: Full-queue policy, one of "block", "drop_oldest" or "sample"
+        sample_every: Keep one record in this many under the "sample" policy
+    """
+    global _writer
+    if _writer is None:
+        _writer = _BackgroundWriter(max_records, policy, sample_every)
+
+
+def dropped_records():
+    """
+    Number of log records dropped by the background writer's queue policy.
+    """
+    return _writer.dropped if _writer is not None else 0
+
+
+def shutdown_logging():
+    """
+    Drain and stop the background writer, then flush and close the log files.
+    Safe to call more than once; also runs at interpreter exit.
+    """
+    global _writer
+    if _writer is not None:
+        writer = _writer
+        _writer = None
+        writer.close()
+        if writer.dropped:
+            log_event("log_records_dropped", count=writer.dropped, policy=writer.policy)
+    _event_sink.close()
+    _state_sink.close()
+
+
+atexit.register(shutdown_logging)
+
+
+def _vector_field(attr):
+    def read(sprite):
+        vector = getattr(sprite, attr)
+        return [round(vector.x, 2), round(vector.y, 2)]
+    return read
+
+
+def _radius_field(sprite):
+    return sprite.radius
+
+
+def _rotation_field(sprite):
+    return round(sprite.rotation, 2)
+
+
+def _layout_for(sprite):
+    # Which fields a sprite class carries is worked out once per class, not per snapshot
+    cls = type(sprite)
+    layout = _layouts.get(cls)
+    if layout is None:
+        layout = []
+        if hasattr(sprite, "position"):
+            layout.append(("pos", _vector_field("position")))
+        if hasattr(sprite, "velocity"):
+            layout.append(("vel", _vector_field("velocity")))
+        if hasattr(sprite, "radius"):
+            layout.append(("rad", _radius_field))
+        if hasattr(sprite, "rotation"):
+            layout.append(("rot", _rotation_field))
+        layout = _layouts[cls] = (cls.__name__, tuple(layout))
+    return layout
+
+
+def _sprite_info(sprite):
+    type_name, fields = _layout_for(sprite)
+    sprite_info = {"type": type_name}
+    for key, read in fields:
+        sprite_info[key] = read(sprite)
+    return sprite_info
+
+
+def register_group(name, group):
+    """
+    Include a sprite group in state snapshots under `name`: its size and
+    up to `_SPRITE_SAMPLE_LIMIT` sampled sprites. Re-registering a name replaces it.
+    """
+    _groups[name] = group
+    _sprites.pop(name, None)
+
+
+def register_sprite(name, sprite):
+    """
+    Include a single sprite (e.g. the player) in state snapshots under `name`.
+    Re-registering a name replaces it.
+    """
+    _sprites[name] = sprite
+    _groups.pop(name, None)
+
+
+def set_screen_size(size):
+    global _screen_size
+    _screen_size = list(size)
 
 
 def log_state():
-    global _frame_count, _state_log_initialized
+    global _frame_count
 
     # Stop logging after `_MAX_SECONDS` seconds
     if _frame_count > _FPS * _MAX_SECONDS:
@@ -30,95 +304,30 @@ def log_state():
 
     now = datetime.now()
 
-    frame = inspect.currentframe()
-    if frame is None:
-        return
-
-    frame_back = frame.f_back
-    if frame_back is None:
-        return
-
-    local_vars = frame_back.f_locals.copy()
-
-    screen_size = []
     game_state = {}
+    for name, group in _groups.items():
+        sprites_data = []
+        for i, sprite in enumerate(group):
+            if i >= _SPRITE_SAMPLE_LIMIT:
+                break
+            sprites_data.append(_sprite_info(sprite))
+        game_state[name] = {"count": len(group), "sprites": sprites_data}
 
-    for key, value in local_vars.items():
-        if "pygame" in str(type(value)) and hasattr(value, "get_size"):
-            screen_size = value.get_size()
-
-        if hasattr(value, "__class__") and "Group" in value.__class__.__name__:
-            sprites_data = []
-
-            for i, sprite in enumerate(value):
-                if i >= _SPRITE_SAMPLE_LIMIT:
-                    break
-
-                sprite_info = {"type": sprite.__class__.__name__}
-
-                if hasattr(sprite, "position"):
-                    sprite_info["pos"] = [
-                        round(sprite.position.x, 2),
-                        round(sprite.position.y, 2),
-                    ]
-
-                if hasattr(sprite, "velocity"):
-                    sprite_info["vel"] = [
-                        round(sprite.velocity.x, 2),
-                        round(sprite.velocity.y, 2),
-                    ]
-
-                if hasattr(sprite, "radius"):
-                    sprite_info["rad"] = sprite.radius
-
-                if hasattr(sprite, "rotation"):
-                    sprite_info["rot"] = round(sprite.rotation, 2)
-
-                sprites_data.append(sprite_info)
-
-            game_state[key] = {"count": len(value), "sprites": sprites_data}
-
-        if len(game_state) == 0 and hasattr(value, "position"):
-            sprite_info = {"type": value.__class__.__name__}
-
-            sprite_info["pos"] = [
-                round(value.position.x, 2),
-                round(value.position.y, 2),
-            ]
-
-            if hasattr(value, "velocity"):
-                sprite_info["vel"] = [
-                    round(value.velocity.x, 2),
-                    round(value.velocity.y, 2),
-                ]
-
-            if hasattr(value, "radius"):
-                sprite_info["rad"] = value.radius
-
-            if hasattr(value, "rotation"):
-                sprite_info["rot"] = round(value.rotation, 2)
-
-            game_state[key] = sprite_info
+    for name, sprite in _sprites.items():
+        game_state[name] = _sprite_info(sprite)
 
     entry = {
         "timestamp": now.strftime("%H:%M:%S.%f")[:-3],
         "elapsed_s": math.floor((now - _start_time).total_seconds()),
         "frame": _frame_count,
-        "screen_size": screen_size,
+        "screen_size": _screen_size,
         **game_state,
     }
 
-    # New log file on each run
-    mode = "w" if not _state_log_initialized else "a"
-    with open("game_state.jsonl", mode) as f:
-        f.write(json.dumps(entry) + "\n")
-
-    _state_log_initialized = True
+    _emit(_state_sink, entry)
 
 
 def log_event(event_type, **details):
-    global _event_log_initialized
-
     now = datetime.now()
 
     event = {
@@ -129,30 +338,7 @@ def log_event(event_type, **details):
         **details,
     }
 
-    mode = "w" if not _event_log_initialized else "a"
-    with open("game_events.jsonl", mode) as f:
-        f.write(json.dumps(event) + "\n")
-
-    _event_log_initialized = True
-
-
-def _read_current_leaderboard():
-    try:
-        with open(_LEADERBOARD_FILE, "r") as f:
-            lines = f.read().splitlines()
-    except FileNotFoundError:
-        return []
-
-    for line in reversed(lines):
-        if not line.strip():
-            continue
-        try:
-            payload = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(payload, dict) and isinstance(payload.get("entries"), list):
-            return payload["entries"]
-    return []
+    _emit(_event_sink, event)
 
 
 def log_leaderboard_score(name, score):
@@ -163,15 +349,4 @@ def log_leaderboard_score(name, score):
         "score": int(score),
         "timestamp": now.strftime("%Y-%m-%dT%H:%M:%S"),
     }
-
-    entries = _read_current_leaderboard()
-    entries.append(entry)
-    entries.sort(key=lambda e: e.get("score", 0), reverse=True)
-
-    payload = {
-        "updated_at": now.strftime("%Y-%m-%dT%H:%M:%S"),
-        "entries": entries,
-    }
-
-    with open(_LEADERBOARD_FILE, "a") as f:
-        f.write(json.dumps(payload) + "\n")
+    get_leaderboard().add(entry)
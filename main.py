@@ -1,52 +1,40 @@
+import os
+import random
+import time
+from datetime import datetime
 import pygame
-from constants import SCREEN_WIDTH, SCREEN_HEIGHT, ASTEROID_MIN_RADIUS, UFO_SCORE
-from logger import log_state, log_event, log_leaderboard_score
-from player import Player
-from asteroid import Asteroid
-from asteroidfield import AsteroidField
-from shot import Shot
+from constants import (
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+    LOG_BACKGROUND_WRITER,
+    LOG_QUEUE_SIZE,
+    LOG_QUEUE_POLICY,
+    DIRTY_RECT_RENDERING,
+    RECORD_REPLAYS,
+    REPLAY_DIR,
+    FIXED_TIMESTEP,
+    RENDER_FPS,
+)
+from logger import (
+    log_event,
+    log_state,
+    log_leaderboard_score,
+    set_screen_size,
+    start_background_writer,
+    shutdown_logging,
+)
 from button import Button
-from ufo import UFO, UFOShot, UFOField
-
-def score_for_radius(radius):
-    if radius <= ASTEROID_MIN_RADIUS:
-        return 100
-    if radius <= ASTEROID_MIN_RADIUS * 2:
-        return 50
-    return 20
-
-def init_game():
-    """
-    Initialize game state including sprite groups, containers, player, and asteroid field.
-    
-    Returns:
-        tuple: (updatable, drawable, asteroids, shots, player) sprite groups and player instance
-    """
-    # Sprite groups
-    updatable = pygame.sprite.Group()
-    drawable = pygame.sprite.Group()
-    asteroids = pygame.sprite.Group()
-    shots = pygame.sprite.Group()
-    ufos = pygame.sprite.Group()
-    ufo_shots = pygame.sprite.Group()
-
-    Player.containers = (updatable, drawable)
-    Asteroid.containers = (asteroids, updatable, drawable)
-    AsteroidField.containers = (updatable)
-    UFO.containers = (ufos, updatable, drawable)
-    UFOShot.containers = (ufo_shots, updatable, drawable)
-    UFOField.containers = (updatable)
-    Shot.containers = (shots, updatable, drawable)
-    
-    # create player
-    player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
-    # create asteroid field
-    AsteroidField()
-    # create ufo field
-    UFOField.player = player
-    UFOField()
-    
-    return updatable, drawable, asteroids, shots, ufos, ufo_shots, player
+from leaderboard import get_leaderboard
+from textcache import text_cache, get_font, GlyphAtlas
+from game import Game
+from render import Renderer, DirtyRenderer
+from assets import Assets
+from controls import RecordingInput
+from player import Player
+from replay import Replay
+from profiler import FrameProfiler, PerfOverlay
+from scheduler import FixedStepScheduler
+from circleshape import CircleShape
 
 def show_game_over_screen(screen, final_score, clock):
     """
@@ -61,8 +49,14 @@ def show_game_over_screen(screen, final_score, clock):
         tuple: ("play_again" or "exit", player_name)
     """
     # Create fonts
-    title_font = pygame.font.Font(None, 72)
-    score_font = pygame.font.Font(None, 48)
+    title_font = get_font(72)
+    score_font = get_font(48)
+    table_font = get_font(32)
+
+    # Leaderboard: top 10 and where this score lands
+    leaderboard = get_leaderboard()
+    top_entries = leaderboard.top(10)
+    rank = leaderboard.rank_of(final_score)
     
     # Create buttons
     button_width = 200
@@ -76,6 +70,9 @@ def show_game_over_screen(screen, final_score, clock):
     input_y = center_y - 10
     play_again_y = center_y + 70
     exit_y = center_y + 150
+    table_x = SCREEN_WIDTH - 320
+    table_y = center_y - 160
+    table_row_height = 30
     
     play_again_button = Button(
         center_x, 
@@ -109,6 +106,11 @@ def show_game_over_screen(screen, final_score, clock):
         input_height,
     )
     input_active = True
+
+    # Semi-transparent overlay, built once for the whole screen
+    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    overlay.set_alpha(200)
+    overlay.fill((0, 0, 0))
     
     # Game over screen loop
     running = True
@@ -140,23 +142,20 @@ def show_game_over_screen(screen, final_score, clock):
             return "exit", name
         
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
         screen.blit(overlay, (0, 0))
         
         # Draw "Game Over" text
-        title_text = title_font.render("Game Over", True, (255, 255, 255))
+        title_text = text_cache.render(title_font, "Game Over", (255, 255, 255))
         title_rect = title_text.get_rect(center=(center_x, title_y))
         screen.blit(title_text, title_rect)
         
         # Draw final score
-        score_text = score_font.render(f"Final Score: {final_score}", True, (255, 255, 255))
+        score_text = text_cache.render(score_font, f"Final Score: {final_score}  (Rank #{rank})", (255, 255, 255))
         score_rect = score_text.get_rect(center=(center_x, score_y))
         screen.blit(score_text, score_rect)
 
         # Draw name input
-        name_label = score_font.render("Name:", True, (255, 255, 255))
+        name_label = text_cache.render(score_font, "Name:", (255, 255, 255))
         name_label_rect = name_label.get_rect(center=(center_x, name_label_y))
         screen.blit(name_label, name_label_rect)
 
@@ -166,10 +165,20 @@ def show_game_over_screen(screen, final_score, clock):
 
         display_name = name if name else "Enter name"
         name_color = (255, 255, 255) if name else (140, 140, 140)
-        name_text = score_font.render(display_name, True, name_color)
+        name_text = text_cache.render(score_font, display_name, name_color)
         name_text_rect = name_text.get_rect(midleft=(input_rect.x + 10, input_rect.centery))
         screen.blit(name_text, name_text_rect)
         
+        # Draw leaderboard
+        table_title = text_cache.render(score_font, "Top 10", (255, 255, 255))
+        screen.blit(table_title, table_title.get_rect(midleft=(table_x, table_y)))
+        for i, entry in enumerate(top_entries):
+            row_y = table_y + (i + 1) * table_row_height + 10
+            row_name = text_cache.render(table_font, f"{i + 1}. {entry.get('name', '')}", (220, 220, 220))
+            screen.blit(row_name, row_name.get_rect(midleft=(table_x, row_y)))
+            row_score = text_cache.render(table_font, str(entry.get("score", 0)), (220, 220, 220))
+            screen.blit(row_score, row_score.get_rect(midright=(table_x + 280, row_y)))
+
         # Draw buttons
         play_again_button.draw(screen)
         exit_button.draw(screen)
@@ -177,282 +186,160 @@ def show_game_over_screen(screen, final_score, clock):
         pygame.display.flip()
         clock.tick(60)
 
+def new_game():
+    """
+    Start a game from a fresh seed, so it can be replayed.
+
+    Returns:
+        tuple: (Game, Replay) with the replay ready to record frames
+    """
+    seed = random.randrange(2**32)
+    random.seed(seed)
+    return Game(), Replay(seed)
+
+
+def save_replay(replay, game):
+    """
+    Write `replay` to REPLAY_DIR, stamped with the score the game ended on.
+    """
+    if not replay.frames:
+        return
+    replay.score = game.score
+    os.makedirs(REPLAY_DIR, exist_ok=True)
+    path = os.path.join(REPLAY_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{replay.seed}.replay")
+    replay.save(path)
+    log_event("replay_saved", path=path, frames=replay.frames, score=game.score)
+
+
 def main():
+    started = time.perf_counter()
     print(f"Starting Asteroids with pygame version: {pygame.version.ver}")
     print(f"Screen width: {SCREEN_WIDTH}") 
     print(f"Screen height: {SCREEN_HEIGHT}")
     # Initialize pygame
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    set_screen_size(screen.get_size())
     clock = pygame.time.Clock()
     dt = 0
-    # display score and lives
-    score = 0
-    font = pygame.font.Font(None, 36)
-    score_surface = font.render(f"Score: {score}", True, "white")
-    lives = 3
-    lives_surface = font.render(f"Lives: {lives}", True, "white")
-    # load background image
-    background_image = pygame.image.load("Background Image.png")
-    background_image = pygame.transform.scale(background_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
+    if LOG_BACKGROUND_WRITER:
+        start_background_writer(LOG_QUEUE_SIZE, LOG_QUEUE_POLICY)
+    # display score and lives: cached labels, numbers drawn from a digit atlas
+    font = get_font(36)
+    score_label = text_cache.render(font, "Score: ", "white")
+    lives_label = text_cache.render(font, "Lives: ", "white")
+    hud_digits = GlyphAtlas(font, "white")
+    # background is decoded and scaled once, then read from the asset cache
+    assets = Assets()
+
+    if DIRTY_RECT_RENDERING:
+        renderer = DirtyRenderer(screen.get_size())
+    else:
+        renderer = Renderer()
+
+    # Record the keys the player reads, for replays
+    recording = RecordingInput(Player.input_source)
+    Player.input_source = recording
+
+    # Per-phase frame timings: F3 shows the overlay, F4 writes a Chrome trace
+    profiler = FrameProfiler()
+    overlay = PerfOverlay(profiler)
+
+    # Physics ticks at a fixed rate, independent of how long frames take to draw
+    scheduler = FixedStepScheduler()
 
     # Initialize game
-    updatable, drawable, asteroids, shots, ufos, ufo_shots, player = init_game()
+    game, replay = new_game()
 
     # Game loop
     running = True
     while running == True:
-        
+        profiler.begin_frame()
         log_state()
+        profiler.mark("log_state")
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-        # Update sprites in updatable group
-        updatable.update(dt)
-        for asteroid in asteroids:
-            # check if player collides with asteroid
-            if asteroid.collides_with(player):
-                lives -= 1
-                lives_surface = font.render(f"Lives: {lives}", True, "white")
-                distance = player.position.distance_to(asteroid.position)
-                nearest = None
-                for other in asteroids:
-                    if not other.alive():
-                        continue
-                    d = player.position.distance_to(other.position)
-                    if nearest is None or d < nearest[0]:
-                        nearest = (d, other)
-                log_event(
-                    "player_hit",
-                    player_pos=[round(player.position.x, 2), round(player.position.y, 2)],
-                    player_radius=player.radius,
-                    asteroid_pos=[round(asteroid.position.x, 2), round(asteroid.position.y, 2)],
-                    asteroid_radius=asteroid.radius,
-                    distance=round(distance, 2),
-                    collides=distance <= player.radius + asteroid.radius,
-                    asteroid_alive=asteroid.alive(),
-                    nearest_asteroid_pos=[
-                        round(nearest[1].position.x, 2),
-                        round(nearest[1].position.y, 2),
-                    ]
-                    if nearest
-                    else None,
-                    nearest_asteroid_radius=nearest[1].radius if nearest else None,
-                    nearest_asteroid_distance=round(nearest[0], 2) if nearest else None,
-                )
-                if lives <= 0:
-                    print("Game over!")
-                    print(f"Player hit asteroid with radius {asteroid.radius}")
-                    print(f"Final Score: {score}")
-                    # Show game over screen
-                    action, player_name = show_game_over_screen(screen, score, clock)
-                    log_leaderboard_score(player_name, score)
-                    if action == "play_again":
-                        # Reset game state
-                        score = 0
-                        lives = 3
-                        score_surface = font.render(f"Score: {score}", True, "white")
-                        lives_surface = font.render(f"Lives: {lives}", True, "white")
-                        # Clear all sprites
-                        for shot in list(shots):
-                            shot.kill()
-                        for ufo_shot in list(ufo_shots):
-                            ufo_shot.kill()
-                        for asteroid in list(asteroids):
-                            asteroid.kill()
-                        for ufo in list(ufos):
-                            ufo.kill()
-                        for sprite in list(updatable):
-                            sprite.kill()
-                        # Reinitialize game
-                        updatable, drawable, asteroids, shots, ufos, ufo_shots, player = init_game()
-                    elif action == "exit":
-                        running = False
-                else:
-                    print("Player respawned")
-                    print(f"lives remaining: {lives}")
-                    player.kill()
-                    for shot in list(shots):
-                        shot.kill()
-                    for ufo_shot in list(ufo_shots):
-                        ufo_shot.kill()
-                    for asteroid in list(asteroids):
-                        asteroid.kill()
-                    for ufo in list(ufos):
-                        ufo.kill()
-                    for sprite in list(updatable):
-                        if isinstance(sprite, (AsteroidField, UFOField)):
-                            sprite.kill()
-                    AsteroidField()
-                    player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
-                    UFOField.player = player
-                    UFOField()
-        for asteroid in asteroids:
-            if not asteroid.alive():
-                continue
-            # check if asteroid collides with shot
-            for shot in shots:
-                if not shot.alive():
-                    continue
-                if asteroid.collides_with(shot):
-                    log_event("asteroid_shot")
-                    score += score_for_radius(asteroid.radius)
-                    score_surface = font.render(f"Score: {score}", True, "white")
-                    log_event(f"asteroid_shot_score_{score_for_radius(asteroid.radius)}")
-                    shot.kill()
-                    asteroid.asteroid_split()
-                    break
-        for ufo in ufos:
-            if not ufo.alive():
-                continue
-            # check if player collides with ufo
-            if ufo.collides_with(player):
-                lives -= 1
-                lives_surface = font.render(f"Lives: {lives}", True, "white")
-                distance = player.position.distance_to(ufo.position)
-                log_event(
-                    "player_hit_ufo",
-                    player_pos=[round(player.position.x, 2), round(player.position.y, 2)],
-                    player_radius=player.radius,
-                    ufo_pos=[round(ufo.position.x, 2), round(ufo.position.y, 2)],
-                    ufo_radius=ufo.radius,
-                    distance=round(distance, 2),
-                    collides=distance <= player.radius + ufo.radius,
-                    ufo_alive=ufo.alive(),
-                )
-                if lives <= 0:
-                    print("Game over!")
-                    print(f"Player hit ufo")
-                    print(f"Final Score: {score}")
-                    action, player_name = show_game_over_screen(screen, score, clock)
-                    log_leaderboard_score(player_name, score)
-                    if action == "play_again":
-                        score = 0
-                        lives = 3
-                        score_surface = font.render(f"Score: {score}", True, "white")
-                        lives_surface = font.render(f"Lives: {lives}", True, "white")
-                        for shot in list(shots):
-                            shot.kill()
-                        for ufo_shot in list(ufo_shots):
-                            ufo_shot.kill()
-                        for asteroid in list(asteroids):
-                            asteroid.kill()
-                        for ufo in list(ufos):
-                            ufo.kill()
-                        for sprite in list(updatable):
-                            sprite.kill()
-                        updatable, drawable, asteroids, shots, ufos, ufo_shots, player = init_game()
-                    elif action == "exit":
-                        running = False
-                else:
-                    print("Player respawned")
-                    print(f"lives remaining: {lives}")
-                    player.kill()
-                    for shot in list(shots):
-                        shot.kill()
-                    for ufo_shot in list(ufo_shots):
-                        ufo_shot.kill()
-                    for asteroid in list(asteroids):
-                        asteroid.kill()
-                    for ufo in list(ufos):
-                        ufo.kill()
-                    for sprite in list(updatable):
-                        if isinstance(sprite, (AsteroidField, UFOField)):
-                            sprite.kill()
-                    AsteroidField()
-                    player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
-                    UFOField.player = player
-                    UFOField()
-        for ufo_shot in ufo_shots:
-            if not ufo_shot.alive():
-                continue
-            if ufo_shot.collides_with(player):
-                lives -= 1
-                lives_surface = font.render(f"Lives: {lives}", True, "white")
-                distance = player.position.distance_to(ufo_shot.position)
-                log_event(
-                    "player_hit_ufo_shot",
-                    player_pos=[round(player.position.x, 2), round(player.position.y, 2)],
-                    player_radius=player.radius,
-                    ufo_shot_pos=[round(ufo_shot.position.x, 2), round(ufo_shot.position.y, 2)],
-                    ufo_shot_radius=ufo_shot.radius,
-                    distance=round(distance, 2),
-                    collides=distance <= player.radius + ufo_shot.radius,
-                    ufo_shot_alive=ufo_shot.alive(),
-                )
-                if lives <= 0:
-                    print("Game over!")
-                    print("Player hit ufo shot")
-                    print(f"Final Score: {score}")
-                    action, player_name = show_game_over_screen(screen, score, clock)
-                    log_leaderboard_score(player_name, score)
-                    if action == "play_again":
-                        score = 0
-                        lives = 3
-                        score_surface = font.render(f"Score: {score}", True, "white")
-                        lives_surface = font.render(f"Lives: {lives}", True, "white")
-                        for shot in list(shots):
-                            shot.kill()
-                        for ufo_shot in list(ufo_shots):
-                            ufo_shot.kill()
-                        for asteroid in list(asteroids):
-                            asteroid.kill()
-                        for ufo in list(ufos):
-                            ufo.kill()
-                        for sprite in list(updatable):
-                            sprite.kill()
-                        updatable, drawable, asteroids, shots, ufos, ufo_shots, player = init_game()
-                    elif action == "exit":
-                        running = False
-                else:
-                    print("Player respawned")
-                    print(f"lives remaining: {lives}")
-                    player.kill()
-                    for shot in list(shots):
-                        shot.kill()
-                    for ufo_shot in list(ufo_shots):
-                        ufo_shot.kill()
-                    for asteroid in list(asteroids):
-                        asteroid.kill()
-                    for ufo in list(ufos):
-                        ufo.kill()
-                    for sprite in list(updatable):
-                        if isinstance(sprite, (AsteroidField, UFOField)):
-                            sprite.kill()
-                    AsteroidField()
-                    player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
-                    UFOField.player = player
-                    UFOField()
-        for ufo in ufos:
-            if not ufo.alive():
-                continue
-            for shot in shots:
-                if not shot.alive():
-                    continue
-                if ufo.collides_with(shot):
-                    log_event("ufo_destroyed")
-                    score += UFO_SCORE
-                    score_surface = font.render(f"Score: {score}", True, "white")
-                    shot.kill()
-                    ufo.kill()
-                    break
-        # Draw background image
-        screen.blit(background_image, (0, 0))
-        #screen.fill("black")
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                overlay.toggle()
+                renderer.invalidate()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                trace_path = f"trace-{datetime.now():%Y%m%d-%H%M%S}.json"
+                profiler.export_chrome_trace(trace_path)
+                log_event("trace_exported", path=trace_path, frames=len(profiler.frames))
+        profiler.mark("events")
+        # Update sprites and resolve collisions, in as many fixed ticks as this frame's time covers
+        if FIXED_TIMESTEP:
+            ticks = scheduler.advance(dt)
+            tick_dt = scheduler.tick_dt
+        else:
+            ticks, tick_dt = 1, dt
+        for _ in range(ticks):
+            game.step(tick_dt, profiler.mark)
+            replay.record(recording.take(), tick_dt)
+            if game.game_over:
+                break
+        if FIXED_TIMESTEP:
+            CircleShape.render_lag = scheduler.lag
+        if game.game_over:
+            if RECORD_REPLAYS:
+                save_replay(replay, game)
+            log_event("scheduler", **scheduler.stats())
+            # Show game over screen
+            action, player_name = show_game_over_screen(screen, game.score, clock)
+            log_leaderboard_score(player_name, game.score)
+            renderer.invalidate()
+            if action == "play_again":
+                # A new Game builds its own world; the old one is dropped whole
+                game, replay = new_game()
+                scheduler.reset()
+            elif action == "exit":
+                running = False
+            profiler.mark("game_over_screen")
+        # Draw background image (only under last frame's sprites in dirty-rect mode)
+        renderer.begin(screen, assets.background())
+        profiler.mark("background")
 
-        # Draw sprites in drawable group    
-        for obj in drawable:
-            obj.draw(screen)
-        screen.blit(score_surface, (16, 16))
-        screen.blit(lives_surface, (16, 48))
-        pygame.display.flip()
+        # Draw sprites in drawable group: pre-rendered images in one batch, then the player
+        renderer.draw(screen, game.drawable)
+        profiler.mark("draw")
+        renderer.mark(screen.blit(score_label, (16, 16)))
+        renderer.mark(hud_digits.draw(screen, str(game.score), (16 + score_label.get_width(), 16)))
+        renderer.mark(screen.blit(lives_label, (16, 48)))
+        renderer.mark(hud_digits.draw(screen, str(game.lives), (16 + lives_label.get_width(), 48)))
+        panel = overlay.draw(screen)
+        if panel is not None:
+            renderer.mark(panel)
+        profiler.mark("hud")
+        renderer.present()
+        profiler.mark("present")
+        profiler.end_frame({
+            "asteroids": len(game.asteroids),
+            "shots": len(game.shots),
+            "ufos": len(game.ufos),
+            "ufo_shots": len(game.ufo_shots),
+        })
+        if started is not None:
+            first_frame_ms = round((time.perf_counter() - started) * 1000, 1)
+            print(f"Time to first frame: {first_frame_ms} ms")
+            log_event("time_to_first_frame", ms=first_frame_ms, asset_cache_hit=assets.cache_hits > 0)
+            started = None
         # FPS limit enforced and checked after each frame
-        dt = clock.tick(60) / 1000.0
+        dt = clock.tick(RENDER_FPS) / 1000.0
+
+    # A game cut short by closing the window is still worth a replay
+    if RECORD_REPLAYS and not game.game_over:
+        save_replay(replay, game)
+    if not game.game_over:
+        log_event("scheduler", **scheduler.stats())
+    Player.input_source = recording.source
+
+    # Drain the log writer on both exits: window closed and "Exit" on the game over screen
+    shutdown_logging()
 
 
 
-    
 
 if __name__ == "__main__":
     main()
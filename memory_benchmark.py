@@ -0,0 +1,94 @@
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+MODES = {"sprite": False, "light": True}
+
+
+def measure(light, count):
+    """
+    Bytes per live entity of each game object class, including its group
+    memberships. Runs in its own process: the entity base class is picked
+    when circleshape is first imported.
+
+    Returns:
+        dict: Class name -> bytes per entity
+    """
+    import constants
+    constants.USE_LIGHT_ENTITIES = light
+
+    import pygame
+    from constants import ASTEROID_MIN_RADIUS, SHOT_RADIUS
+    from game import init_game
+    from asteroid import Asteroid
+    from shot import Shot
+    from ufo import UFO, UFOShot
+
+    pygame.init()
+    updatable, drawable, asteroids, shots, ufos, ufo_shots, player = init_game()
+    factories = {
+        "Asteroid": lambda: Asteroid(100.0, 100.0, ASTEROID_MIN_RADIUS * 2),
+        "Shot": lambda: Shot(100.0, 100.0, SHOT_RADIUS),
+        "UFO": lambda: UFO(100.0, 100.0, 1),
+        "UFOShot": lambda: UFOShot(100.0, 100.0, 4),
+    }
+    results = {}
+    for name, factory in factories.items():
+        # Shared one-off state (shape pool outlines, dict resizes) is not per-entity cost
+        factory().kill()
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(count):
+            factory()
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        results[name] = round((after - before) / count, 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory per game entity, pygame Sprite vs light entity.")
+    parser.add_argument("--count", type=int, default=5000, help="entities created per class")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--mode", choices=sorted(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        # Spawning logs events into the working directory; keep them out of the repo
+        os.chdir(tempfile.mkdtemp(prefix="asteroids-membench-"))
+        print(json.dumps(measure(MODES[args.mode], args.count)))
+        return
+
+    results = {"count": args.count, "bytes_per_entity": {}}
+    for mode in MODES:
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode, "--count", str(args.count)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results["bytes_per_entity"][mode] = json.loads(child.stdout.strip().splitlines()[-1])
+
+    sprite = results["bytes_per_entity"]["sprite"]
+    light = results["bytes_per_entity"]["light"]
+    print(f"{'class':>10} {'sprite':>10} {'light':>10} {'saved':>7}")
+    for name in sprite:
+        saved = 1 - light[name] / sprite[name]
+        print(f"{name:>10} {sprite[name]:>10.1f} {light[name]:>10.1f} {saved:>7.0%}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,32 +2,39 @@ import pygame
 from constants import PLAYER_RADIUS, LINE_WIDTH, PLAYER_TURN_SPEED, PLAYER_SPEED
 from circleshape import CircleShape
 from shot import Shot
-from constants import SHOT_RADIUS, PLAYER_SHOT_SPEED
+from constants import SHOT_RADIUS, PLAYER_SHOT_SPEED, SCREEN_WRAP
+from controls import KeyboardInput
 import sys
 
 class Player(CircleShape):
+    # Where update() reads key state from; swapped for scripted input in headless runs
+    input_source = KeyboardInput()
+
     def __init__(self, x, y):
         super().__init__(x, y, PLAYER_RADIUS)
         self.rotation = 0
         self.shot_cooldown = 0
         self.PLAYER_SHOT_COOLDOWN_SECONDS = 0.3
     
-    def triangle(self):
+    def triangle(self, position=None):
+        if position is None:
+            position = self.position
         forward = pygame.Vector2(0, 1).rotate(self.rotation)
         right = pygame.Vector2(0, 1).rotate(self.rotation + 90) * self.radius / 1.5
-        a = self.position + forward * self.radius
-        b = self.position - forward * self.radius - right
-        c = self.position - forward * self.radius + right
+        a = position + forward * self.radius
+        b = position - forward * self.radius - right
+        c = position - forward * self.radius + right
         return [a, b, c]
 
     def draw(self, screen):
-        pygame.draw.polygon(screen, "white", self.triangle(), LINE_WIDTH)
+        pygame.draw.polygon(screen, "white", self.triangle(self.render_position()), LINE_WIDTH)
 
     def rotate(self, dt):
         self.rotation += PLAYER_TURN_SPEED * dt
 
     def update(self, dt):
-        keys = pygame.key.get_pressed()
+        keys = self.input_source.get_pressed()
+        start = pygame.Vector2(self.position)
 
         if keys[pygame.K_a]:
            self.rotate(-dt)
@@ -48,6 +55,12 @@ class Player(CircleShape):
         if keys[pygame.K_ESCAPE]:
             sys.exit()
         self.shot_cooldown -= dt
+        # The player moves by key presses, not velocity; derive one for
+        # interpolated drawing and swept collision tests
+        if dt > 0:
+            self.velocity = (self.position - start) / dt
+        if SCREEN_WRAP:
+            self.wrap()
         
     def move(self, dt):
         unit_vector = pygame.Vector2(0, 1)
@@ -56,5 +69,5 @@ class Player(CircleShape):
         self.position += rotated_with_speed_vector
 
     def shoot(self):
-        shot = Shot(self.position.x, self.position.y, SHOT_RADIUS)
+        shot = Shot.spawn(self.position.x, self.position.y, SHOT_RADIUS)
         shot.velocity = pygame.Vector2(0, 1).rotate(self.rotation) * PLAYER_SHOT_SPEED
@@ -0,0 +1,80 @@
+from constants import SPRITE_POOL_MAX_SIZE
+
+_pools = []
+
+
+class SpritePool:
+    def __init__(self, cls, max_size=SPRITE_POOL_MAX_SIZE):
+        """
+        Free list of dead sprites of one CircleShape subclass, handed out again
+        by `cls.spawn()` instead of constructing new objects.
+
+        Killed sprites only become reusable at the next recycle() (the start
+        of a frame): code that still holds one later in the same frame must
+        keep seeing it dead, not as some freshly spawned sprite.
+
+        Args:
+            cls: Sprite class to pool; instances are reset with cls.reset()
+            max_size: Most dead sprites kept; the rest are left to the garbage collector
+        """
+        self.cls = cls
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._free = []
+        self._pending = []
+        _pools.append(self)
+
+    def acquire(self, *args):
+        if self._free:
+            self.hits += 1
+            sprite = self._free.pop()
+            sprite.reset(*args)
+            sprite.add(sprite.containers)
+            return sprite
+        self.misses += 1
+        return self.cls(*args)
+
+    def release(self, sprite):
+        if len(self._free) + len(self._pending) < self.max_size:
+            self._pending.append(sprite)
+
+    def recycle(self):
+        self._free.extend(self._pending)
+        self._pending.clear()
+
+    def clear(self):
+        self._free.clear()
+        self._pending.clear()
+
+    @property
+    def hit_rate(self):
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    def __len__(self):
+        return len(self._free) + len(self._pending)
+
+
+def recycle_pools():
+    """
+    Make every sprite killed since the last call available for reuse.
+    """
+    for pool in _pools:
+        pool.recycle()
+
+
+def pool_stats():
+    """
+    Returns:
+        dict: Per pooled class: hits, misses, hit rate and sprites held
+    """
+    return {
+        pool.cls.__name__: {
+            "hits": pool.hits,
+            "misses": pool.misses,
+            "hit_rate": round(pool.hit_rate, 3),
+            "size": len(pool),
+        }
+        for pool in _pools
+    }
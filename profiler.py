@@ -0,0 +1,163 @@
+import json
+import time
+from collections import deque
+import pygame
+from constants import PROFILE_HISTORY
+from textcache import text_cache, get_font, GlyphAtlas
+
+
+class FrameProfiler:
+    def __init__(self, history=PROFILE_HISTORY):
+        """
+        Per-phase timings of the last `history` frames, kept in a ring buffer.
+
+        A frame is begin_frame(), then mark(phase) after each phase (time
+        since the previous mark is charged to `phase`), then end_frame() with
+        that frame's entity counts.
+
+        Args:
+            history: Number of frames kept
+        """
+        self.frames = deque(maxlen=history)
+        self._clock = time.perf_counter
+        self._origin = self._clock()
+        self._frame_start = 0.0
+        self._last = 0.0
+        self._phases = []
+
+    def begin_frame(self):
+        self._frame_start = self._last = self._clock()
+        self._phases = []
+
+    def mark(self, phase):
+        now = self._clock()
+        self._phases.append((phase, self._last, now))
+        self._last = now
+
+    def end_frame(self, counts=None):
+        """
+        Args:
+            counts: Optional dict of group name -> entity count for this frame
+        """
+        self.frames.append((self._frame_start, self._last, self._phases, counts or {}))
+
+    def frame_times(self):
+        """
+        Milliseconds from begin_frame() to the last mark of every buffered frame, oldest first.
+        """
+        return [(end - start) * 1000 for start, end, _, _ in self.frames]
+
+    def phase_averages(self, frames=60):
+        """
+        Mean milliseconds per phase over the last `frames` frames, in phase order.
+
+        Returns:
+            dict: phase name -> ms
+        """
+        recent = list(self.frames)[-frames:]
+        totals = {}
+        for _, _, phases, _ in recent:
+            for phase, start, end in phases:
+                totals[phase] = totals.get(phase, 0.0) + (end - start) * 1000
+        return {phase: total / len(recent) for phase, total in totals.items()}
+
+    def export_chrome_trace(self, path):
+        """
+        Write the buffered frames as Chrome trace-event JSON (chrome://tracing,
+        Perfetto): one complete event per frame and per phase, plus a counter
+        track for the entity counts.
+        """
+        events = []
+
+        def micros(t):
+            return round((t - self._origin) * 1_000_000, 1)
+
+        for index, (start, end, phases, counts) in enumerate(self.frames):
+            events.append({
+                "name": "frame",
+                "ph": "X",
+                "ts": micros(start),
+                "dur": round((end - start) * 1_000_000, 1),
+                "pid": 1,
+                "tid": 1,
+                "args": {"index": index},
+            })
+            for phase, phase_start, phase_end in phases:
+                events.append({
+                    "name": phase,
+                    "ph": "X",
+                    "ts": micros(phase_start),
+                    "dur": round((phase_end - phase_start) * 1_000_000, 1),
+                    "pid": 1,
+                    "tid": 1,
+                })
+            if counts:
+                events.append({"name": "entities", "ph": "C", "ts": micros(start), "pid": 1, "args": counts})
+
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class PerfOverlay:
+    def __init__(self, profiler, width=300):
+        """
+        Panel in the top-right corner with ms per phase, the latest entity
+        counts and a sparkline of frame times. Labels come from the text cache
+        and numbers from a glyph atlas, so drawing it re-renders no text.
+
+        Args:
+            profiler: FrameProfiler to read from
+            width: Panel width in pixels
+        """
+        self.profiler = profiler
+        self.width = width
+        self.visible = False
+        self.font = get_font(20)
+        self.digits = GlyphAtlas(self.font, "white", glyphs="0123456789.")
+        self.line_height = self.font.get_linesize()
+        self.sparkline_height = 40
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def draw(self, screen):
+        """
+        Draw the panel if visible.
+
+        Returns:
+            pygame.Rect: Area drawn, or None when hidden
+        """
+        if not self.visible or not self.profiler.frames:
+            return None
+
+        averages = self.profiler.phase_averages()
+        counts = self.profiler.frames[-1][3]
+        rows = [(phase, f"{ms:.2f}") for phase, ms in averages.items()]
+        rows += [(name, str(count)) for name, count in counts.items()]
+        height = (len(rows) + 1) * self.line_height + self.sparkline_height + 16
+        panel = pygame.Rect(screen.get_width() - self.width - 8, 8, self.width, height)
+
+        screen.fill((0, 0, 0), panel)
+        pygame.draw.rect(screen, (90, 90, 90), panel, 1)
+        x = panel.x + 8
+        y = panel.y + 6
+        screen.blit(text_cache.render(self.font, "ms / frame (avg of 60)", (160, 160, 160)), (x, y))
+        y += self.line_height
+        for label, value in rows:
+            screen.blit(text_cache.render(self.font, label, "white"), (x, y))
+            self.digits.draw(screen, value, (panel.right - 64, y))
+            y += self.line_height
+
+        times = self.profiler.frame_times()
+        graph = pygame.Rect(x, y + 4, self.width - 16, self.sparkline_height)
+        # Scale to at least one 60 fps frame so a quiet game doesn't look busy
+        peak = max(max(times), 1000 / 60)
+        budget_y = graph.bottom - graph.height * (1000 / 60) / peak
+        pygame.draw.line(screen, (120, 60, 60), (graph.left, budget_y), (graph.right, budget_y))
+        if len(times) > 1:
+            step = graph.width / (len(times) - 1)
+            points = [
+                (graph.left + i * step, graph.bottom - graph.height * ms / peak) for i, ms in enumerate(times)
+            ]
+            pygame.draw.lines(screen, (120, 220, 120), False, points)
+        return panel
@@ -0,0 +1,228 @@
+import pygame
+from constants import LINE_WIDTH, BATCHED_RENDERING, DIRTY_RECT_THRESHOLD, SCREEN_WRAP
+from circleshape import CircleShape
+from world import ghost_shifts
+
+_circle_images = {}
+
+
+def prepare_image(surface):
+    """
+    Finish a pre-rendered sprite image for fast repeated blits.
+
+    Args:
+        surface: SRCALPHA surface holding a thin outline
+
+    Returns:
+        pygame.Surface: The image to blit
+    """
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert_alpha()
+    # RLE skips the transparent runs, which are nearly the whole outline image
+    surface.set_alpha(255, pygame.RLEACCEL)
+    return surface
+
+
+def circle_image(color, radius):
+    """
+    Shared outline circle image of `radius`, as drawn by pygame.draw.circle
+    with LINE_WIDTH.
+
+    Returns:
+        tuple: (surface, half) where `half` is the offset from the center to the top-left corner
+    """
+    key = (color, radius)
+    cached = _circle_images.get(key)
+    if cached is None:
+        half = int(radius) + LINE_WIDTH
+        surface = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, color, (half, half), radius, LINE_WIDTH)
+        cached = _circle_images[key] = (prepare_image(surface), half)
+    return cached
+
+
+class Renderer:
+    def __init__(self, batched=BATCHED_RENDERING):
+        """
+        Draws a sprite group once per frame. Sprites that have a pre-rendered
+        image (see CircleShape.blit_image) are collected and submitted in a
+        single screen.blits() call; the rest, like the player triangle, are
+        drawn immediately after the batch. Sprites held by an EntityStore are
+        positioned with one read of its arrays instead of one per sprite.
+
+        With SCREEN_WRAP, sprites hanging over a screen edge are drawn again
+        at the opposite edge.
+
+        Per-frame counts of the last draw() are kept in `sprites`,
+        `batched_sprites`, `immediate` and `draw_calls` (one for the batch
+        plus one per immediately drawn sprite).
+
+        Args:
+            batched: False draws every sprite through its own draw(), for comparison
+        """
+        self.batched = batched
+        # Screen areas painted this frame; only collected by DirtyRenderer
+        self.dirty = None
+        self.sprites = 0
+        self.batched_sprites = 0
+        self.immediate = 0
+        self.draw_calls = 0
+
+    def begin(self, screen, background):
+        """
+        Start a frame by covering the whole screen with `background`.
+        """
+        screen.blit(background, (0, 0))
+
+    def mark(self, rect):
+        """
+        Record an area painted outside draw(), such as HUD text.
+        """
+
+    def invalidate(self):
+        """
+        The screen was drawn over by someone else; repaint all of it next frame.
+        """
+
+    def present(self):
+        pygame.display.flip()
+
+    def _draw_sprite(self, screen, sprite):
+        sprite.draw(screen)
+        bounds = sprite.bounds()
+        if self.dirty is not None:
+            self.dirty.append(bounds)
+        if not SCREEN_WRAP:
+            return
+        for shift in ghost_shifts(*bounds):
+            CircleShape.render_shift = pygame.Vector2(shift)
+            sprite.draw(screen)
+            if self.dirty is not None:
+                self.dirty.append(sprite.bounds())
+        CircleShape.render_shift = None
+
+    def draw(self, screen, sprites):
+        """
+        Draw `sprites` onto `screen`.
+
+        Returns:
+            int: Number of draw calls submitted this frame
+        """
+        if not self.batched:
+            count = 0
+            for sprite in sprites:
+                self._draw_sprite(screen, sprite)
+                count += 1
+            self.sprites = self.immediate = self.draw_calls = count
+            self.batched_sprites = 0
+            return self.draw_calls
+
+        blits = []
+        immediate = []
+        # (index in blits, slot, image) of store-backed sprites, placed after the loop
+        stored = []
+        store = None
+        for sprite in sprites:
+            image = sprite.blit_image()
+            if image is None:
+                immediate.append(sprite)
+                continue
+            slot = getattr(sprite, "_slot", None)
+            if slot is None:
+                surface, half = image
+                position = sprite.render_position()
+                blits.append((surface, (position.x - half, position.y - half)))
+            else:
+                store = sprite.store
+                stored.append((len(blits), slot, image))
+                blits.append(None)
+        if stored:
+            positions = store.render_positions([slot for _, slot, _ in stored], CircleShape.render_lag)
+            for (index, _, (surface, half)), (x, y) in zip(stored, positions):
+                blits[index] = (surface, (x - half, y - half))
+        sprite_count = len(blits) + len(immediate)
+        if SCREEN_WRAP:
+            for image, (x, y) in blits[:]:
+                for dx, dy in ghost_shifts(x, y, image.get_width(), image.get_height()):
+                    blits.append((image, (x + dx, y + dy)))
+
+        draw_calls = len(immediate)
+        if blits:
+            if self.dirty is None:
+                screen.blits(blits, doreturn=False)
+            else:
+                self.dirty.extend(screen.blits(blits))
+            draw_calls += 1
+        # Dynamic shapes go on top of the batch
+        for sprite in immediate:
+            self._draw_sprite(screen, sprite)
+
+        self.sprites = sprite_count
+        self.batched_sprites = sprite_count - len(immediate)
+        self.immediate = len(immediate)
+        self.draw_calls = draw_calls
+        return draw_calls
+
+
+class DirtyRenderer(Renderer):
+    def __init__(self, screen_size, threshold=DIRTY_RECT_THRESHOLD, batched=BATCHED_RENDERING):
+        """
+        Renderer that repaints only what changed. begin() restores the
+        background under everything drawn the frame before, and present()
+        pushes just those areas and this frame's with pygame.display.update().
+
+        When the dirty area covers more than `threshold` of the screen it
+        falls back to a full flip, and the next frame starts with a full
+        background blit instead of many small ones.
+
+        Args:
+            screen_size: (width, height) of the display surface
+            threshold: Fraction of the screen area above which a full flip is used
+            batched: See Renderer
+        """
+        super().__init__(batched)
+        self.screen_rect = pygame.Rect((0, 0), screen_size)
+        self.threshold = threshold
+        self.dirty = []
+        self.full_redraw = True
+        self.full_frames = 0
+        self.dirty_frames = 0
+        self._previous = []
+
+    def begin(self, screen, background):
+        if self.full_redraw:
+            screen.blit(background, (0, 0))
+        else:
+            screen.blits([(background, rect, rect) for rect in self._previous], doreturn=False)
+
+    def mark(self, rect):
+        self.dirty.append(rect)
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def present(self):
+        screen_rect = self.screen_rect
+        current = []
+        area = 0
+        for rect in self.dirty:
+            rect = rect.clip(screen_rect)
+            if rect.w and rect.h:
+                current.append(rect)
+                area += rect.w * rect.h
+        # Overlaps are counted twice, so this errs towards full flips
+        for rect in self._previous:
+            area += rect.w * rect.h
+        too_large = area > self.threshold * screen_rect.w * screen_rect.h
+
+        if self.full_redraw or too_large:
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            # Old positions need pushing too, now showing background again
+            pygame.display.update(self._previous + current)
+            self.dirty_frames += 1
+
+        self.full_redraw = too_large
+        self._previous = current
+        self.dirty = []
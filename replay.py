@@ -0,0 +1,157 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import struct
+from controls import KEYS, ScriptedInput, names_to_bits
+
+REPLAY_VERSION = 1
+# magic, version, seed, frames, score at the last frame, length of the key names, distinct dts
+_HEADER = struct.Struct("<4sBQIiHH")
+_MAGIC = b"ASRP"
+# One run of identical frames: repeat count, input bitmask, index into the dt table
+_RUN = struct.Struct("<HBH")
+_MAX_RUN = 0xFFFF
+if len(KEYS) > 8:
+    raise ImportError("replay input bitmasks hold at most 8 keys")
+# Replays never quit the process they are played back in
+_ESCAPE_BIT = names_to_bits(["escape"])
+
+
+class Replay:
+    def __init__(self, seed, score=0):
+        """
+        Everything needed to re-simulate one game: the seed of the `random`
+        module and, per frame, the input bitmask Player.update read (bit order
+        of controls.KEYS) and dt.
+
+        On disk: a small header, the table of distinct dt values (a windowed
+        game only sees a handful of clock.tick() results) and run-length
+        encoded frames of 5 bytes per run, so fixed-timestep runs and long
+        stretches of held keys take a few bytes.
+
+        Args:
+            seed: Seed passed to random.seed() before the Game was created
+            score: Score after the last frame, stored to check playback against
+        """
+        self.seed = seed
+        self.score = score
+        self.keys = tuple(KEYS)
+        self._runs = []  # [count, bits, dt]
+        self.frames = 0
+
+    def record(self, bits, dt):
+        runs = self._runs
+        if runs and runs[-1][1] == bits and runs[-1][2] == dt and runs[-1][0] < _MAX_RUN:
+            runs[-1][0] += 1
+        else:
+            runs.append([1, bits, dt])
+        self.frames += 1
+
+    def inputs(self):
+        """
+        The recorded per-frame input bitmasks.
+        """
+        for count, bits, _ in self._runs:
+            for _ in range(count):
+                yield bits
+
+    def dts(self):
+        """
+        The recorded per-frame times.
+        """
+        for count, _, dt in self._runs:
+            for _ in range(count):
+                yield dt
+
+    def __len__(self):
+        return self.frames
+
+    def save(self, path):
+        names = ",".join(self.keys).encode()
+        # dt values are stored exactly, once each
+        dt_index = {}
+        for _, _, dt in self._runs:
+            dt_index.setdefault(dt, len(dt_index))
+        with open(path, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    _MAGIC, REPLAY_VERSION, self.seed, self.frames, self.score, len(names), len(dt_index)
+                )
+            )
+            f.write(names)
+            f.write(struct.pack(f"<{len(dt_index)}d", *dt_index))
+            f.write(b"".join(_RUN.pack(count, bits, dt_index[dt]) for count, bits, dt in self._runs))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, frames, score, names_length, dt_count = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"{path} has replay version {version}, expected {REPLAY_VERSION}")
+        offset = _HEADER.size
+        keys = tuple(data[offset:offset + names_length].decode().split(","))
+        if keys != tuple(KEYS):
+            raise ValueError(f"{path} was recorded with keys {keys}, not {tuple(KEYS)}")
+        offset += names_length
+        dt_table = struct.unpack_from(f"<{dt_count}d", data, offset)
+        offset += dt_count * 8
+
+        replay = cls(seed, score)
+        replay._runs = [[count, bits, dt_table[index]] for count, bits, index in _RUN.iter_unpack(data[offset:])]
+        replay.frames = sum(run[0] for run in replay._runs)
+        if replay.frames != frames:
+            raise ValueError(f"{path} is truncated: {replay.frames} of {frames} frames")
+        return replay
+
+
+def play(replay):
+    """
+    Re-simulate a replay without a display, as fast as the CPU allows.
+
+    Returns:
+        dict: run_headless summary plus whether frames and score match the recording
+    """
+    # Imported here so loading and saving replays doesn't pull in the game
+    from headless import run_headless
+
+    inputs = ScriptedInput(bits & ~_ESCAPE_BIT for bits in replay.inputs())
+    result = run_headless(len(replay), seed=replay.seed, inputs=inputs, dts=replay.dts())
+    del result["dt"]
+    result["recorded_frames"] = len(replay)
+    result["recorded_score"] = replay.score
+    result["matches"] = result["frames"] == len(replay) and result["score"] == replay.score
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play back recorded Asteroids replays without a display.")
+    parser.add_argument("replays", nargs="+", help="replay files (or directories of them) to play")
+    args = parser.parse_args()
+
+    paths = []
+    for path in args.replays:
+        if os.path.isdir(path):
+            paths.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".replay")
+            )
+        else:
+            paths.append(path)
+
+    mismatches = 0
+    for path in paths:
+        # Game prints (respawns, game over) would drown the one-line results
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = play(Replay.load(path))
+        mismatches += not result["matches"]
+        print(json.dumps({"replay": path, **result}))
+    if mismatches:
+        raise SystemExit(f"{mismatches} of {len(paths)} replays diverged from their recording")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from constants import PHYSICS_TICK_RATE, MAX_SUBSTEPS
+
+
+class FixedStepScheduler:
+    def __init__(self, tick_rate=PHYSICS_TICK_RATE, max_substeps=MAX_SUBSTEPS):
+        """
+        Turns variable frame times into a whole number of fixed-length
+        simulation ticks. Frame time is collected in an accumulator and spent
+        one tick_dt at a time, so physics and collisions always see the same
+        dt however long a frame took to draw. The unspent remainder says how
+        far between the last two ticks a frame should be drawn (see lag).
+
+        A frame that would need more than `max_substeps` ticks to catch up
+        runs only that many and drops the rest, so one slow frame can't make
+        every following frame slower still.
+
+        Args:
+            tick_rate: Simulation ticks per second
+            max_substeps: Most ticks run for a single frame
+        """
+        self.tick_dt = 1.0 / tick_rate
+        self.max_substeps = max_substeps
+        self.accumulator = 0.0
+        self.frames = 0
+        self.ticks = 0
+        # Ticks dropped by the max_substeps cap: simulated time that was lost
+        self.skipped_ticks = 0
+        # Frames too short to run a tick; their time is merged into a later one
+        self.merged_frames = 0
+
+    def advance(self, dt):
+        """
+        Add one frame's time.
+
+        Args:
+            dt: Seconds since the previous frame
+
+        Returns:
+            int: Number of ticks of tick_dt to run for this frame
+        """
+        self.frames += 1
+        self.accumulator += dt
+        # The epsilon keeps e.g. two 1/120 s ticks in a 1/60 s frame from rounding down to one
+        ticks = int(self.accumulator / self.tick_dt + 1e-9)
+        if ticks > self.max_substeps:
+            self.skipped_ticks += ticks - self.max_substeps
+            ticks = self.max_substeps
+        self.accumulator = max(0.0, self.accumulator - ticks * self.tick_dt)
+        if self.accumulator >= self.tick_dt:
+            # Only left over when ticks were skipped; that time is gone
+            self.accumulator %= self.tick_dt
+        if ticks == 0:
+            self.merged_frames += 1
+        self.ticks += ticks
+        return ticks
+
+    @property
+    def lag(self):
+        """
+        Seconds the drawn frame trails the latest tick. Drawing sprites this
+        far back along their velocity interpolates between the last two
+        ticks.
+        """
+        return self.tick_dt - self.accumulator
+
+    def reset(self):
+        # Drop time collected for a game that is over
+        self.accumulator = 0.0
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "ticks": self.ticks,
+            "skipped_ticks": self.skipped_ticks,
+            "merged_frames": self.merged_frames,
+        }
@@ -1,14 +1,22 @@
-from circleshape import CircleShape
-from constants import LINE_WIDTH
+from entitystore import StoredShape
+from constants import LINE_WIDTH, SHOT_LIFETIME_SECONDS, USE_SPRITE_POOLS
 import pygame
+from render import circle_image
+from pool import SpritePool
+
+class Shot(StoredShape):
+    __slots__ = ()
+    max_lifetime = SHOT_LIFETIME_SECONDS
 
-class Shot(CircleShape):
     def __init__(self, x, y, radius):
         super().__init__(x, y, radius)
 
+    def blit_image(self):
+        return circle_image("white", self.radius)
+
     def draw(self, screen):
-        pygame.draw.circle(screen, "white", self.position, self.radius, LINE_WIDTH)
+        pygame.draw.circle(screen, "white", self.render_position(), self.radius, LINE_WIDTH)
+
 
-    def update(self, dt):
-        self.position += self.velocity * dt
-        
\ No newline at end of file
+if USE_SPRITE_POOLS:
+    Shot.pool = SpritePool(Shot)
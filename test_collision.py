@@ -0,0 +1,188 @@
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+import circleshape
+import collision
+import entitystore
+from circleshape import CircleShape
+from collision import (
+    SpatialGrid,
+    collision_pairs,
+    collisions_with,
+    swept_overlap,
+    swept_collision_pairs,
+    swept_collisions_with,
+)
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from entitystore import EntityStore, StoredShape
+
+
+def random_circles(rng, count, radii=(5, 20, 40, 60), cls=CircleShape, wrapped=False):
+    if wrapped:
+        # Nothing leaves the screen when it wraps
+        return [cls(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), rng.choice(radii)) for _ in range(count)]
+    # Spread a little past the screen, like sprites about to be reclaimed
+    return [cls(rng.uniform(-100, 1380), rng.uniform(-100, 820), rng.choice(radii)) for _ in range(count)]
+
+
+@pytest.fixture
+def wrap(monkeypatch):
+    monkeypatch.setattr(circleshape, "SCREEN_WRAP", True)
+    monkeypatch.setattr(collision, "SCREEN_WRAP", True)
+    monkeypatch.setattr(entitystore, "SCREEN_WRAP", True)
+
+
+@pytest.fixture(params=[False, True], ids=["bounded", "wrapped"])
+def screen_wrap(request):
+    if request.param:
+        request.getfixturevalue("wrap")
+    return request.param
+
+
+@pytest.fixture
+def store():
+    pytest.importorskip("numpy")
+    previous = StoredShape.store
+    StoredShape.store = EntityStore()
+    yield StoredShape.store
+    StoredShape.store = previous
+
+
+@pytest.fixture(params=[CircleShape, StoredShape], ids=["sprite", "store"])
+def shape_class(request):
+    if request.param is StoredShape:
+        request.getfixturevalue("store")
+    return request.param
+
+
+def set_moving(rng, circles, speed):
+    for circle in circles:
+        circle.velocity = pygame.Vector2(0, 1).rotate(rng.uniform(0, 360)) * rng.uniform(0, speed)
+        circle.age = rng.uniform(0, 0.2)
+    return circles
+
+
+def brute_force_pairs(group_a, group_b, dt=None):
+    # Every pair through the exact test; swept back over `dt` when it is given
+    if dt is None:
+        return [(a, b) for a in group_a for b in group_b if a.collides_with(b)]
+    return [(a, b) for a in group_a for b in group_b if swept_overlap(a, b, min(b.age, dt))]
+
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_collision_pairs_match_nested_loops(shape_class, screen_wrap, seed):
+    rng = random.Random(seed)
+    asteroids = random_circles(rng, 80, cls=shape_class, wrapped=screen_wrap)
+    shots = random_circles(rng, 120, radii=(5,), cls=shape_class, wrapped=screen_wrap)
+    assert collision_pairs(asteroids, shots) == brute_force_pairs(asteroids, shots)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_collisions_with_matches_nested_loop(shape_class, screen_wrap, seed):
+    rng = random.Random(seed)
+    player = CircleShape(rng.uniform(0, 1280), rng.uniform(0, 720), 20)
+    asteroids = random_circles(rng, 300, cls=shape_class, wrapped=screen_wrap)
+    expected = [asteroid for _, asteroid in brute_force_pairs([player], asteroids)]
+    assert collisions_with(player, asteroids) == expected
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("dt", [1 / 60, 0.1])
+def test_swept_collision_pairs_match_nested_loops(shape_class, screen_wrap, seed, dt):
+    rng = random.Random(seed)
+    asteroids = set_moving(rng, random_circles(rng, 80, cls=shape_class, wrapped=screen_wrap), 100)
+    shots = set_moving(rng, random_circles(rng, 120, radii=(5,), cls=shape_class, wrapped=screen_wrap), 3000)
+    assert swept_collision_pairs(asteroids, shots, dt) == brute_force_pairs(asteroids, shots, dt)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_swept_collisions_with_matches_nested_loop(screen_wrap, seed):
+    rng = random.Random(seed)
+    player = set_moving(rng, [CircleShape(rng.uniform(0, 1280), rng.uniform(0, 720), 20)], 200)[0]
+    ufo_shots = set_moving(rng, random_circles(rng, 300, radii=(4,), wrapped=screen_wrap), 3000)
+    expected = [shot for _, shot in brute_force_pairs([player], ufo_shots, 0.1)]
+    assert swept_collisions_with(player, ufo_shots, 0.1) == expected
+
+
+def test_swept_test_catches_a_shot_passing_through():
+    asteroid = CircleShape(400, 300, 20)
+    # Moved from x = 300 to x = 500 this frame, right through the asteroid
+    shot = CircleShape(500, 300, 5)
+    shot.velocity = pygame.Vector2(200 / 0.1, 0)
+    shot.age = 1.0
+    assert collision_pairs([asteroid], [shot]) == []
+    assert swept_collision_pairs([asteroid], [shot], 0.1) == [(asteroid, shot)]
+    # Spawned halfway through the frame at x = 500, already past the asteroid
+    shot.position = pygame.Vector2(600, 300)
+    shot.age = 0.05
+    assert swept_collision_pairs([asteroid], [shot], 0.1) == []
+
+
+def test_touching_circles_collide():
+    a = CircleShape(100, 100, 20)
+    b = CircleShape(130, 100, 10)
+    assert collision_pairs([a], [b]) == [(a, b)]
+    b.position = pygame.Vector2(130.01, 100)
+    assert collision_pairs([a], [b]) == []
+
+
+def test_circles_larger_than_a_cell(shape_class):
+    rng = random.Random(1)
+    big = random_circles(rng, 10, radii=(150, 400), cls=shape_class)
+    small = random_circles(rng, 200, radii=(5, 20), cls=shape_class)
+    assert collision_pairs(big, small) == brute_force_pairs(big, small)
+
+
+def test_empty_groups():
+    circles = random_circles(random.Random(0), 5)
+    assert collision_pairs([], circles) == []
+    assert collision_pairs(circles, []) == []
+    assert collisions_with(circles[0], []) == []
+
+
+def test_grid_query_returns_insertion_order():
+    rng = random.Random(2)
+    circles = random_circles(rng, 200)
+    grid = SpatialGrid(circles)
+    probe = CircleShape(640, 360, 100)
+    candidates = grid.query(probe)
+    assert candidates == sorted(candidates, key=circles.index)
+    # Every real overlap must be among the candidates
+    assert set(collisions_with(probe, circles)) <= set(candidates)
+
+
+def test_wrapped_collisions_across_the_seams(wrap, shape_class):
+    cls = shape_class
+    asteroid = cls(5, 300, 20)
+    shot = cls(SCREEN_WIDTH - 5, 300, 5)
+    assert collision_pairs([asteroid], [shot]) == [(asteroid, shot)]
+    corner = cls(3, 3, 10)
+    opposite = cls(SCREEN_WIDTH - 3, SCREEN_HEIGHT - 3, 5)
+    assert collision_pairs([corner], [opposite]) == [(corner, opposite)]
+    # Moved left from x = 40 across the seam this frame, through the asteroid
+    shot.position = pygame.Vector2(SCREEN_WIDTH - 40, 300)
+    shot.velocity = pygame.Vector2(-80 / 0.1, 0)
+    shot.age = 1.0
+    assert collision_pairs([asteroid], [shot]) == []
+    assert swept_collision_pairs([asteroid], [shot], 0.1) == [(asteroid, shot)]
+
+
+def test_wrapped_collides_with_measures_across_the_seams(wrap, shape_class):
+    asteroid = shape_class(5, 300, 20)
+    shot = shape_class(SCREEN_WIDTH - 5, 300, 5)
+    assert asteroid.collides_with(shot)
+    assert shot.collides_with(asteroid)
+    assert shape_class(3, 3, 10).collides_with(shape_class(SCREEN_WIDTH - 3, SCREEN_HEIGHT - 3, 5))
+    assert not asteroid.collides_with(shape_class(SCREEN_WIDTH / 2, 300, 5))
+
+
+def test_without_wrap_the_seams_are_apart():
+    asteroid = CircleShape(5, 300, 20)
+    shot = CircleShape(SCREEN_WIDTH - 5, 300, 5)
+    assert collision_pairs([asteroid], [shot]) == []
+    assert not asteroid.collides_with(shot)
@@ -0,0 +1,67 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from entitystore import EntityStore, StoredShape
+
+
+@pytest.fixture
+def store():
+    previous = StoredShape.store
+    StoredShape.store = EntityStore(capacity=2)
+    yield StoredShape.store
+    StoredShape.store = previous
+
+
+def test_vectors_write_through(store):
+    shape = StoredShape(10, 20, 5)
+    shape.position.x += 1
+    shape.position[1] = 7
+    shape.velocity.update(3, 4)
+    shape.velocity.rotate_ip(90)
+    assert store.positions[shape._slot].tolist() == [11, 7]
+    assert shape.velocity == pygame.Vector2(-4, 3)
+
+
+def test_in_place_arithmetic_writes_through(store):
+    shape = StoredShape(10, 20, 5)
+    shape.position += pygame.Vector2(1, 1)
+    position = shape.position
+    position *= 2
+    assert shape.position == pygame.Vector2(22, 42)
+
+
+def test_derived_vectors_are_detached(store):
+    shape = StoredShape(10, 20, 5)
+    moved = shape.position + pygame.Vector2(5, 5)
+    moved.x = 100
+    moved += pygame.Vector2(1, 1)
+    assert shape.position == pygame.Vector2(10, 20)
+
+
+def test_killed_shape_keeps_its_state(store):
+    shapes = [StoredShape(i, i, 5) for i in range(3)]  # grows past capacity
+    shape = shapes[1]
+    shape.velocity = pygame.Vector2(1, 2)
+    shape.kill()
+    assert shape._slot is None
+    assert shape.position == pygame.Vector2(1, 1)
+    assert shape.velocity == pygame.Vector2(1, 2)
+    shape.position.x = 50
+    assert shape.position == pygame.Vector2(50, 1)
+    # The freed slot no longer follows the dead shape
+    assert not store.live[1]
+
+
+def test_render_positions_match_render_position(store):
+    shapes = [StoredShape(i * 10, i * 20, 5) for i in range(5)]
+    for i, shape in enumerate(shapes):
+        shape.velocity = pygame.Vector2(i, -i)
+    slots = [shape._slot for shape in shapes]
+    expected = [list(shape.position - shape.velocity * 0.25) for shape in shapes]
+    assert store.render_positions(slots, 0.25) == expected
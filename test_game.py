@@ -0,0 +1,74 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pytest
+import ufo
+from asteroid import Asteroid
+from constants import SHOT_LIFETIME_SECONDS
+from controls import RandomInput
+from game import Game
+from headless import run_headless
+from shot import Shot
+from ufo import UFO, UFOShot
+
+
+@pytest.fixture
+def game():
+    game = Game()
+    # Nothing else may wander into the hits under test
+    for sprite in list(game.asteroids) + list(game.ufos):
+        sprite.kill()
+    game.lives = 1
+    return game
+
+
+def resolve_frame(game):
+    for name in game.COLLISION_PASSES:
+        getattr(game, name)()
+    return game.resolve_hits()
+
+
+def test_no_score_after_a_fatal_hit_in_the_same_frame(game):
+    player = game.player
+    Asteroid.spawn(player.position.x, player.position.y, 20)
+    Asteroid.spawn(100, 100, 20)
+    Shot.spawn(100, 100, 5)
+    resolve_frame(game)
+    assert game.game_over
+    assert game.score == 0
+
+
+def test_no_ufo_score_after_a_fatal_hit_in_the_same_frame(game):
+    player = game.player
+    Asteroid.spawn(player.position.x, player.position.y, 20)
+    UFO(100, 100, 1)
+    Shot.spawn(100, 100, 5)
+    resolve_frame(game)
+    assert game.game_over
+    assert game.score == 0
+
+
+def test_shot_hits_score_while_the_player_lives(game):
+    Asteroid.spawn(100, 100, 20)
+    Shot.spawn(100, 100, 5)
+    resolve_frame(game)
+    assert not game.game_over
+    assert game.score > 0
+
+
+@pytest.mark.parametrize("wrap", [False, True])
+def test_ufo_shot_lifetime_follows_screen_wrap(monkeypatch, wrap):
+    monkeypatch.setattr(ufo, "SCREEN_WRAP", wrap)
+    shot = UFOShot(100, 100, 4)
+    assert shot.max_lifetime == (SHOT_LIFETIME_SECONDS if wrap else None)
+    assert (shot.max_lifetime is None) == (UFO(100, 100, 1).max_lifetime is None)
+
+
+def test_shape_pool_does_not_change_a_seeded_run(monkeypatch):
+    results = []
+    for use_shape_pool in (True, False):
+        monkeypatch.setattr(Asteroid, "use_shape_pool", use_shape_pool)
+        summary = run_headless(1800, seed=5, inputs=RandomInput(5))
+        results.append({key: summary[key] for key in ("frames", "score", "lives", "peak_entities")})
+    assert results[0] == results[1]
@@ -0,0 +1,35 @@
+import random
+import pytest
+from leaderboard import Leaderboard
+
+
+def retained_entries(leaderboard):
+    kept = {id(entry) for _, _, entry in leaderboard._heap}
+    kept.update(id(entry) for entry in leaderboard._best.values())
+    return len(kept)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_retained_count_is_kept_up_to_date(tmp_path, seed):
+    rng = random.Random(seed)
+    path = str(tmp_path / "leaderboard.jsonl")
+    leaderboard = Leaderboard(path, size=10)
+    for i in range(500):
+        leaderboard.add({"name": f"player{rng.randrange(15)}", "score": rng.randrange(200), "timestamp": i})
+        assert leaderboard._retained == retained_entries(leaderboard)
+
+    reloaded = Leaderboard(path, size=10)
+    assert reloaded._retained == retained_entries(reloaded)
+    assert reloaded.top(10) == leaderboard.top(10)
+    assert len(reloaded) == len(leaderboard) == 500
+
+
+def test_file_is_compacted_as_scores_come_in(tmp_path):
+    path = tmp_path / "leaderboard.jsonl"
+    leaderboard = Leaderboard(str(path), size=5)
+    for i in range(200):
+        leaderboard.add({"name": "solo", "score": i, "timestamp": i})
+    # The retained records plus at most the slack, and one score_counts line
+    assert len(path.read_text().splitlines()) <= 5 + 32 + 1
+    assert leaderboard.best_for("solo")["score"] == 199
+    assert leaderboard.rank_of(0) == 200
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+import pygame
+
+TEXT_CACHE_SIZE = 256
+
+
+class TextCache:
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        """
+        LRU cache of rendered text surfaces keyed on (font, text, color).
+
+        Args:
+            max_entries: Number of surfaces kept before the least recently used is dropped
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        """
+        Same as font.render(text, antialias, color), but rendered only once.
+        Callers must not draw onto the returned surface.
+        """
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+class GlyphAtlas:
+    def __init__(self, font, color, glyphs="0123456789-"):
+        """
+        One pre-rendered surface per glyph, so changing numbers (score, lives)
+        are drawn glyph by glyph instead of re-rendering the whole string.
+
+        Args:
+            font: pygame.font.Font to render with
+            color: Text color
+            glyphs: Characters the atlas can draw
+        """
+        self.glyphs = {glyph: font.render(glyph, True, color) for glyph in glyphs}
+
+    def draw(self, screen, text, topleft):
+        """
+        Blit `text` with its top-left corner at `topleft`.
+
+        Returns:
+            pygame.Rect: Area covered by the drawn glyphs
+        """
+        x, y = topleft
+        height = 0
+        blits = []
+        for glyph in text:
+            surface = self.glyphs[glyph]
+            blits.append((surface, (x, y)))
+            x += surface.get_width()
+            height = max(height, surface.get_height())
+        screen.blits(blits, doreturn=False)
+        return pygame.Rect(topleft[0], y, x - topleft[0], height)
+
+
+_fonts = {}
+
+
+def get_font(size):
+    """
+    Shared default pygame font of `size`, so cache keys stay stable across screens.
+    """
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+
+text_cache = TextCache()
@@ -9,25 +9,64 @@ from constants import (
     UFO_SPEED,
     UFO_SHOT_SPEED,
     UFO_SPAWN_RATE_SECONDS,
+    USE_SPRITE_POOLS,
+    SHOT_LIFETIME_SECONDS,
+    SCREEN_WRAP,
 )
 from logger import log_event
+from world import wrap_offset
+from render import circle_image, prepare_image
+from pool import SpritePool
+
+
+_ufo_images = {}
+
+
+def ufo_image(radius):
+    """
+    Shared pre-rendered UFO outline of `radius`, drawn the same way as UFO.draw.
+
+    Returns:
+        tuple: (surface, half) where `half` is the offset from the center to the top-left corner
+    """
+    cached = _ufo_images.get(radius)
+    if cached is None:
+        half = int(radius * 1.1) + LINE_WIDTH
+        surface = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+        UFO.draw_outline(surface, pygame.Vector2(half, half), radius)
+        cached = _ufo_images[radius] = (prepare_image(surface), half)
+    return cached
 
 
 class UFO(CircleShape):
+    __slots__ = ("shot_timer", "player")
+
+    @property
+    def max_lifetime(self):
+        # Wrapped UFOs never fly off screen; they leave after one crossing instead
+        return SCREEN_WIDTH / UFO_SPEED if SCREEN_WRAP else None
+
     def __init__(self, x, y, direction):
         super().__init__(x, y, UFO_RADIUS)
         self.velocity = pygame.Vector2(direction * UFO_SPEED, 0)
         self.shot_timer = random.uniform(0.6, 1.2)
 
-    def draw(self, screen):
-        body_rect = pygame.Rect(0, 0, self.radius * 2.2, self.radius)
-        body_rect.center = self.position
-        dome_rect = pygame.Rect(0, 0, self.radius, self.radius * 0.6)
-        dome_rect.center = (self.position.x, self.position.y - self.radius * 0.25)
+    @staticmethod
+    def draw_outline(screen, position, radius):
+        body_rect = pygame.Rect(0, 0, radius * 2.2, radius)
+        body_rect.center = position
+        dome_rect = pygame.Rect(0, 0, radius, radius * 0.6)
+        dome_rect.center = (position.x, position.y - radius * 0.25)
 
         pygame.draw.ellipse(screen, "white", body_rect, LINE_WIDTH)
         pygame.draw.ellipse(screen, "white", dome_rect, LINE_WIDTH)
 
+    def blit_image(self):
+        return ufo_image(self.radius)
+
+    def draw(self, screen):
+        self.draw_outline(screen, self.render_position(), self.radius)
+
     def update(self, dt):
         self.position += self.velocity * dt
         self.shot_timer -= dt
@@ -36,41 +75,45 @@ class UFO(CircleShape):
             self.shoot()
             self.shot_timer = random.uniform(0.6, 1.2)
 
-        if (
-            self.position.x < -self.radius * 3
-            or self.position.x > SCREEN_WIDTH + self.radius * 3
-            or self.position.y < -self.radius * 3
-            or self.position.y > SCREEN_HEIGHT + self.radius * 3
-        ):
-            self.kill()
+        self.expire(dt)
 
     def shoot(self):
         direction = (self.player.position - self.position)
+        if SCREEN_WRAP:
+            # Aim the short way around, which may be across an edge
+            direction = wrap_offset(direction)
         if direction.length() == 0:
             direction = pygame.Vector2(0, 1)
         direction = direction.normalize()
-        shot = UFOShot(self.position.x, self.position.y, 4)
+        shot = UFOShot.spawn(self.position.x, self.position.y, 4)
         shot.velocity = direction * UFO_SHOT_SPEED
         log_event("ufo_shot")
 
 
 class UFOShot(CircleShape):
+    __slots__ = ()
+
+    @property
+    def max_lifetime(self):
+        # Wrapped shots never fly off screen, so they need a lifetime
+        return SHOT_LIFETIME_SECONDS if SCREEN_WRAP else None
+
     def __init__(self, x, y, radius):
         super().__init__(x, y, radius)
 
+    def blit_image(self):
+        return circle_image("red", self.radius)
+
     def draw(self, screen):
-        pygame.draw.circle(screen, "red", self.position, self.radius, LINE_WIDTH)
+        pygame.draw.circle(screen, "red", self.render_position(), self.radius, LINE_WIDTH)
 
     def update(self, dt):
         self.position += self.velocity * dt
+        self.expire(dt)
+
 
-        if (
-            self.position.x < -self.radius * 2
-            or self.position.x > SCREEN_WIDTH + self.radius * 2
-            or self.position.y < -self.radius * 2
-            or self.position.y > SCREEN_HEIGHT + self.radius * 2
-        ):
-            self.kill()
+if USE_SPRITE_POOLS:
+    UFOShot.pool = SpritePool(UFOShot)
 
 
 class UFOField(pygame.sprite.Sprite):
@@ -81,7 +124,11 @@ class UFOField(pygame.sprite.Sprite):
     def spawn(self):
         from_left = random.choice([True, False])
         direction = 1 if from_left else -1
-        start_x = -UFO_RADIUS * 2 if from_left else SCREEN_WIDTH + UFO_RADIUS * 2
+        if SCREEN_WRAP:
+            # Spawned on the left/right seam, which is the edge of a wrapped screen either way
+            start_x = 0
+        else:
+            start_x = -UFO_RADIUS * 2 if from_left else SCREEN_WIDTH + UFO_RADIUS * 2
         start_y = random.uniform(UFO_RADIUS * 2, SCREEN_HEIGHT - UFO_RADIUS * 2)
         ufo = UFO(start_x, start_y, direction)
         ufo.player = getattr(self, "player", None)
@@ -0,0 +1,40 @@
+import pygame
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+def wrap_offset(offset):
+    """
+    Shortest vector equivalent to `offset` on the wrapped screen, where
+    leaving through one edge means coming back in at the opposite one. Used
+    instead of testing ghost copies of sprites near the edges.
+
+    Args:
+        offset: pygame.Vector2 difference of two positions
+
+    Returns:
+        pygame.Vector2 with |x| <= SCREEN_WIDTH / 2 and |y| <= SCREEN_HEIGHT / 2
+    """
+    x = offset.x
+    y = offset.y
+    return pygame.Vector2(x - SCREEN_WIDTH * round(x / SCREEN_WIDTH), y - SCREEN_HEIGHT * round(y / SCREEN_HEIGHT))
+
+
+def ghost_shifts(left, top, width, height):
+    """
+    Offsets at which something drawn over the given area has to be drawn again
+    so the part hanging over a screen edge shows at the opposite edge.
+
+    Returns:
+        list: (dx, dy) tuples, empty when the area is inside the screen
+    """
+    xs = [0]
+    if left < 0:
+        xs.append(SCREEN_WIDTH)
+    if left + width > SCREEN_WIDTH:
+        xs.append(-SCREEN_WIDTH)
+    ys = [0]
+    if top < 0:
+        ys.append(SCREEN_HEIGHT)
+    if top + height > SCREEN_HEIGHT:
+        ys.append(-SCREEN_HEIGHT)
+    return [(dx, dy) for dx in xs for dy in ys if dx or dy]